@@ -169,44 +169,50 @@ class ReportService:
 
         monthly_trends = await self.sales_collection.aggregate(monthly_trends_pipeline).to_list(24)
 
-        # Top 10 customers by revenue
-        top_customers_pipeline = [
+        # Top 10 customers by revenue and top 10 products by volume share
+        # the same match stage, so run them as one $facet aggregation:
+        # the match (and its index scan) executes once and both rankings
+        # come back in a single round-trip
+        top_pipeline = [
             {"$match": match_stage},
-            {
-                "$group": {
-                    "_id": "$customerId",
-                    "totalRevenue": {"$sum": {"$ifNull": ["$totalSales", 0]}},
-                    "totalQuantity": {"$sum": {"$ifNull": ["$quantity", 0]}},
-                    "transactions": {"$sum": 1}
-                }
-            },
-            {"$sort": {"totalRevenue": -1}},
-            {"$limit": 10}
+            {"$facet": {
+                "customers": [
+                    {
+                        "$group": {
+                            "_id": "$customerId",
+                            "totalRevenue": {"$sum": {"$ifNull": ["$totalSales", 0]}},
+                            "totalQuantity": {"$sum": {"$ifNull": ["$quantity", 0]}},
+                            "transactions": {"$sum": 1}
+                        }
+                    },
+                    {"$sort": {"totalRevenue": -1}},
+                    {"$limit": 10}
+                ],
+                "products": [
+                    {
+                        "$group": {
+                            "_id": "$productId",
+                            "totalQuantity": {"$sum": {"$ifNull": ["$quantity", 0]}},
+                            "totalRevenue": {"$sum": {"$ifNull": ["$totalSales", 0]}},
+                            "transactions": {"$sum": 1}
+                        }
+                    },
+                    {"$sort": {"totalQuantity": -1}},
+                    {"$limit": 10}
+                ]
+            }}
         ]
 
-        top_customers = await self.sales_collection.aggregate(top_customers_pipeline).to_list(10)
+        top_result = await self.sales_collection.aggregate(top_pipeline).to_list(1)
+        top_facets = top_result[0] if top_result else {}
+        top_customers = top_facets.get("customers", [])
 
         # Enrich with customer names
         for customer in top_customers:
             customer_doc = await self.customers_collection.find_one({"customerId": customer["_id"]})
             customer["customerName"] = customer_doc["customerName"] if customer_doc else customer["_id"]
 
-        # Top 10 products by volume
-        top_products_pipeline = [
-            {"$match": match_stage},
-            {
-                "$group": {
-                    "_id": "$productId",
-                    "totalQuantity": {"$sum": {"$ifNull": ["$quantity", 0]}},
-                    "totalRevenue": {"$sum": {"$ifNull": ["$totalSales", 0]}},
-                    "transactions": {"$sum": 1}
-                }
-            },
-            {"$sort": {"totalQuantity": -1}},
-            {"$limit": 10}
-        ]
-
-        top_products = await self.sales_collection.aggregate(top_products_pipeline).to_list(10)
+        top_products = top_facets.get("products", [])
 
         # Enrich with product descriptions
         for product in top_products:
@@ -0,0 +1,96 @@
+"""
+Shared admin-token cache for the deployed-backend test scripts
+
+Repeated script runs reuse the cached JWT from ~/.sop_test_token.json until
+shortly before its `exp` claim, skipping the login round-trip (and the
+server-side bcrypt work) on every run. Entries are keyed by base URL, so
+scripts that target different Render deployments never overwrite each
+other's tokens.
+"""
+import base64
+import json
+import os
+import time
+
+TOKEN_CACHE = os.path.expanduser("~/.sop_test_token.json")
+ADMIN_CREDS = {"email": "admin@heavygarlic.com", "password": "admin123"}
+# Refresh this long before the token actually expires (seconds)
+EXPIRY_MARGIN = 60
+
+
+def _token_exp(token):
+    """Read the `exp` claim from a JWT without verifying the signature."""
+    payload = token.split(".")[1]
+    payload += "=" * (-len(payload) % 4)
+    return json.loads(base64.urlsafe_b64decode(payload)).get("exp", 0)
+
+
+def _read_cache():
+    """Return the {base_url: entry} cache dict, or {} when unreadable.
+
+    A pre-per-host flat cache file (one unkeyed entry) also lands here
+    as {}: its entries have no URL key, so they simply read as a miss.
+    """
+    try:
+        with open(TOKEN_CACHE) as f:
+            cached = json.load(f)
+        if isinstance(cached, dict):
+            return {k: v for k, v in cached.items()
+                    if isinstance(v, dict) and "access_token" in v}
+    except (OSError, ValueError):
+        pass
+    return {}
+
+
+def load_cached_token(base_url):
+    """Return the cached token for `base_url` if still fresh, else None."""
+    entry = _read_cache().get(base_url)
+    try:
+        if entry and entry["exp"] - time.time() > EXPIRY_MARGIN:
+            return entry["access_token"]
+    except (TypeError, KeyError):
+        pass
+    return None
+
+
+def store_token(token, base_url):
+    """Write a freshly issued token (and its exp claim) for `base_url`."""
+    try:
+        exp = _token_exp(token)
+    except (IndexError, ValueError):
+        exp = time.time() + 15 * 60
+    cache = _read_cache()
+    cache[base_url] = {"access_token": token, "exp": exp}
+    with open(TOKEN_CACHE, "w") as f:
+        json.dump(cache, f)
+
+
+def drop_token(base_url):
+    """Forget the cached token for `base_url` (e.g. after a 401)."""
+    cache = _read_cache()
+    if cache.pop(base_url, None) is not None:
+        with open(TOKEN_CACHE, "w") as f:
+            json.dump(cache, f)
+
+
+def get_token(session, base_url):
+    """Return a cached admin token, logging in again only when it is stale."""
+    token = load_cached_token(base_url)
+    if token:
+        return token
+
+    response = session.post(
+        f"{base_url}/auth/login",
+        json=ADMIN_CREDS,
+        headers={"Content-Type": "application/json"}
+    )
+    # Fail here with the server's answer rather than handing callers
+    # None (which turns into "Authorization: Bearer None" on every call)
+    response.raise_for_status()
+    token = response.json().get("access_token")
+    if not token:
+        raise RuntimeError(
+            f"login to {base_url} returned no access_token: "
+            f"{response.text[:200]}")
+    store_token(token, base_url)
+    return token
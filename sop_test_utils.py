@@ -0,0 +1,286 @@
+"""
+Shared session and ephemeral-user helpers for the deployed-backend tests
+
+Every auth-flow script repeats the same slow prologue/epilogue: admin
+login, timestamped user create, delete on the way out. Centralising it
+here means one pooled Session (one TLS handshake) per script run, and a
+guaranteed cleanup even when the middle of a test raises.
+"""
+import json
+import os
+import socket
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection
+
+from sop_test_auth import get_token
+
+try:
+    import orjson
+
+    def parse_json(response):
+        """Decode a response body with orjson (C parser, fast on numbers)."""
+        return orjson.loads(response.content)
+
+    def dump_json(obj):
+        """Encode a request body with orjson (~3-5x the stdlib encoder)."""
+        return orjson.dumps(obj)
+
+    loads_json = orjson.loads
+except ImportError:  # orjson is optional; fall back to the stdlib codec
+    def parse_json(response):
+        return response.json()
+
+    def dump_json(obj):
+        return json.dumps(obj).encode()
+
+    loads_json = json.loads
+
+
+class KeepAliveAdapter(HTTPAdapter):
+    """HTTPAdapter that disables Nagle and enables TCP keep-alive.
+
+    The stats/history calls are small request/response pairs, so Nagle's
+    delay on the final segment is pure added latency.
+    """
+
+    _socket_options = HTTPConnection.default_socket_options + [
+        (socket.IPPROTO_TCP, socket.TCP_NODELAY, 1),
+        (socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1),
+    ]
+
+    def init_poolmanager(self, *args, **kwargs):
+        kwargs["socket_options"] = self._socket_options
+        super().init_poolmanager(*args, **kwargs)
+
+
+def short_body(response, n=500):
+    """First `n` bytes of a response body, decoded for error logging.
+
+    `response.text` decodes the whole body even when we only print a
+    snippet; slicing `content` first keeps the decode cost at O(n).
+    """
+    return response.content[:n].decode("utf-8", "replace")
+
+
+class StepLog:
+    """Buffer one step's output and emit it with a single write.
+
+    On line-buffered CI pipes every print() is its own syscall and can
+    interleave with network logging; batching a step's lines keeps them
+    contiguous and cheap.
+    """
+
+    def __init__(self):
+        self.lines = []
+
+    def __iadd__(self, line):
+        self.lines.append(line)
+        return self
+
+    def flush(self):
+        if self.lines:
+            sys.stdout.write("\n".join(self.lines) + "\n")
+            sys.stdout.flush()
+            self.lines.clear()
+
+
+def wait_ready(session, url, timeout=300):
+    """Poll a health URL until it answers 200 or the timeout lapses.
+
+    Replaces the fixed deploy-wait sleeps: a warm backend answers within
+    a couple of seconds, while a cold deploy is probed with exponential
+    backoff (2s growing toward 15s) up to `timeout` seconds.
+    """
+    deadline = time.monotonic() + timeout
+    delay = 2.0
+    while time.monotonic() < deadline:
+        try:
+            if session.get(url, timeout=3).status_code == 200:
+                return True
+        except requests.RequestException:
+            pass
+        time.sleep(min(delay, max(0, deadline - time.monotonic())))
+        delay = min(delay * 1.5, 15)
+    return False
+
+
+@contextmanager
+def admin_session(base_url):
+    """Yield a pooled Session whose default headers carry the admin token."""
+    session = requests.Session()
+    session.headers.update({"Content-Type": "application/json"})
+    session.mount("https://", HTTPAdapter(pool_connections=10, pool_maxsize=20))
+    token = get_token(session, base_url)
+    session.headers["Authorization"] = f"Bearer {token}"
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@contextmanager
+def ephemeral_user(session, base_url, prefix="soptest", role="sales_rep",
+                   password="SopTest123!", full_name="Ephemeral Test User"):
+    """Create a throwaway user, yield its record, and delete it on exit."""
+    timestamp = int(time.time())
+    payload = {
+        "username": f"{prefix}_{timestamp}",
+        "email": f"{prefix}_{timestamp}@test.com",
+        "fullName": full_name,
+        "role": role,
+        "password": password,
+    }
+    create_response = session.post(f"{base_url}/users", json=payload)
+    create_response.raise_for_status()
+    create_data = parse_json(create_response)
+    user = dict(payload)
+    user["_id"] = create_data["user"]["_id"]
+    user["create_data"] = create_data
+    try:
+        yield user
+    finally:
+        session.delete(f"{base_url}/users/{user['_id']}", timeout=10)
+
+
+# The filter-suite payloads never change, so encode them once at import
+# time; each request then ships precomputed bytes (with a known
+# Content-Length) instead of re-running the JSON encoder per call.
+PDF_NOV_2024_BODY = dump_json({
+    "reportType": "sales_summary",
+    "format": "pdf",
+    "startDate": "2024-11-01",
+    "endDate": "2024-11-30",
+    "includeCharts": False,
+    "includeRawData": True,
+})
+# (name, filename, body, size_only): the "all data" report exists only
+# to size-compare against the filtered ones, so its body never needs to
+# touch the disk — Content-Length from the response headers is enough.
+EXCEL_JOBS = [
+    ("all data", "all_data_report_{tag}.xlsx", dump_json({
+        "reportType": "sales_summary",
+        "format": "excel",
+        "includeCharts": False,
+        "includeRawData": True,
+    }), True),
+    ("Nov 2024", "november_2024_only_report_{tag}.xlsx", dump_json({
+        "reportType": "sales_summary",
+        "format": "excel",
+        "startDate": "2024-11-01",
+        "endDate": "2024-11-30",
+        "includeCharts": False,
+        "includeRawData": True,
+    }), False),
+    ("2023", "2023_only_report_{tag}.xlsx", dump_json({
+        "reportType": "sales_summary",
+        "format": "excel",
+        "startDate": "2023-01-01",
+        "endDate": "2023-12-31",
+        "includeCharts": False,
+        "includeRawData": True,
+    }), False),
+]
+
+
+def run_filter_suite(session, base_url, token, tag):
+    """Run the PDF + date-filtered Excel report flow once and save the files.
+
+    The pre- and post-deployment date-filtering scripts were copy-paste
+    twins; the shared flow lives here so the four report generations run
+    exactly once per variant. `tag` lands in the saved filenames (e.g.
+    ``all_data_report_FIXED.xlsx``). Returns {filename: size_in_bytes}
+    for every file that was written, so callers can compare the ranges.
+    """
+    headers = {
+        "Authorization": f"Bearer {token}",
+        "Content-Type": "application/json",
+    }
+    sizes = {}
+
+    print(f"\n   Testing PDF report generation...")
+    pdf_response = session.post(
+        f"{base_url}/reports/generate-instant",
+        stream=True,
+        data=PDF_NOV_2024_BODY,
+        headers=headers,
+        timeout=60
+    )
+    print(f"   PDF report status: {pdf_response.status_code}")
+    print(f"   Content-Type: {pdf_response.headers.get('content-type', 'N/A')}")
+    if pdf_response.status_code == 200:
+        if 'application/pdf' in pdf_response.headers.get('content-type', ''):
+            print(f"   ✅ PDF generation successful!")
+            filename = f"november_2024_report_{tag}.pdf"
+            pdf_size = 0
+            with open(filename, 'wb') as f:
+                for chunk in pdf_response.iter_content(chunk_size=64 * 1024):
+                    f.write(chunk)
+                    pdf_size += len(chunk)
+            sizes[filename] = pdf_size
+            print(f"   [OK] Saved PDF as: {filename}")
+            print(f"   PDF file size: {pdf_size} bytes")
+        else:
+            print(f"   ❌ PDF generation failed - unexpected content type")
+            print(f"   Response: {short_body(pdf_response)}")
+    else:
+        print(f"   ❌ PDF generation failed: {short_body(pdf_response)}")
+
+    print(f"\n   Testing date filtering with Excel (concurrently)...")
+
+    # The three Excel exports are independent, so dispatch them together
+    # and let the backend pipeline them; wall clock is max(latency), not
+    # the sum. The shared session keeps TLS handshakes amortized.
+    # Streaming and writing happen inside the worker too, so the three
+    # bodies hit the disk in parallel instead of queueing behind the
+    # as_completed loop.
+    def fetch_and_save(name, filename, body, size_only):
+        response = session.post(f"{base_url}/reports/generate-instant",
+                                data=body, headers=headers, stream=True,
+                                timeout=60)
+        if response.status_code != 200:
+            return name, filename, response.status_code, None
+        # Size-only jobs read Content-Length and drop the connection:
+        # the multi-MB body is never transferred just to getsize() it.
+        # (generate-instant only renders on POST, so a HEAD/metadata
+        # variant isn't available; the header is the cheap path.)
+        if size_only and "content-length" in response.headers:
+            size = int(response.headers["content-length"])
+            response.close()
+            return name, filename, response.status_code, size
+        # Stream to disk in 64 KiB chunks; peak memory stays flat
+        with open(filename, 'wb') as f:
+            for chunk in response.iter_content(chunk_size=64 * 1024):
+                f.write(chunk)
+        return name, filename, response.status_code, os.path.getsize(filename)
+
+    with ThreadPoolExecutor(max_workers=4) as ex:
+        futures = [ex.submit(fetch_and_save, name, filename.format(tag=tag),
+                             body, size_only)
+                   for name, filename, body, size_only in EXCEL_JOBS]
+        for future in as_completed(futures):
+            name, filename, status, size = future.result()
+            print(f"   Excel ({name}) status: {status}")
+            if size is not None:
+                sizes[filename] = size
+                print(f"   [OK] Saved {name} report")
+    return sizes
+
+
+def delete_users(session, base_url, user_ids, max_workers=10):
+    """Delete many test users concurrently; cleanup cost is O(1) RTT.
+
+    max_workers stays below the adapter's pool_maxsize so the deletes
+    reuse pooled connections instead of exhausting them.
+    """
+    if not user_ids:
+        return []
+    with ThreadPoolExecutor(max_workers=max_workers) as ex:
+        return list(ex.map(
+            lambda uid: session.delete(f"{base_url}/users/{uid}", timeout=5),
+            user_ids))
@@ -0,0 +1,175 @@
+"""
+Consolidated driver for the deployed report tests
+
+Replaces running test_deployed_backend_final.py, test_deployed_fixes.py and
+test_final_all_charts_disabled.py back to back: one session, one login, one
+warmed connection, then the report cases run as a loop.
+"""
+import requests
+from sop_test_auth import get_token
+from sop_test_utils import KeepAliveAdapter
+from urllib3.util.retry import Retry
+import zipfile
+import xml.etree.ElementTree as ET
+
+BASE_URL = "https://sales-and-operation-planning-platform-1.onrender.com/api/v1"
+
+# Shared session with a bounded retry policy so transient Render 502/503s
+# are retried with a short backoff instead of burning the full 60s timeout
+session = requests.Session()
+retry = Retry(
+    total=3,
+    backoff_factor=0.25,
+    status_forcelist=(502, 503, 504),
+    allowed_methods=frozenset(["GET", "POST"]),
+    raise_on_status=False,
+)
+session.mount("https://", KeepAliveAdapter(max_retries=retry, pool_maxsize=8))
+# Ask for a compressed transfer; harmless if the server sends identity
+session.headers["Accept-Encoding"] = "gzip, deflate, br"
+
+# One report case per former script, keeping the per-case filenames
+CASES = [
+    {
+        "name": "with charts",
+        "filename": "november_2024_report_final_test.xlsx",
+        "params": {
+            "reportType": "sales_summary",
+            "format": "excel",
+            "startDate": "2024-11-01",
+            "endDate": "2024-11-30",
+            "includeCharts": True,
+            "includeRawData": True,
+        },
+    },
+    {
+        "name": "charts disabled",
+        "filename": "november_2024_report_FINAL_SUCCESS.xlsx",
+        "params": {
+            "reportType": "sales_summary",
+            "format": "excel",
+            "startDate": "2024-11-01",
+            "endDate": "2024-11-30",
+            "includeCharts": False,
+            "includeRawData": True,
+        },
+    },
+]
+
+
+def login():
+    """Return the admin bearer token, reusing the on-disk cache when fresh."""
+    return get_token(session, BASE_URL)
+
+
+def generate_instant(token, case):
+    """POST /reports/generate-instant for one case and save the Excel file."""
+    response = session.post(
+        f"{BASE_URL}/reports/generate-instant",
+        json=case["params"],
+        headers={
+            "Authorization": f"Bearer {token}",
+            "Content-Type": "application/json"
+        },
+        timeout=60
+    )
+    print(f"   Instant report status: {response.status_code}")
+    if response.status_code != 200:
+        print(f"   [ERROR] Report generation failed: {response.text[:500]}")
+        return None
+    if 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet' not in response.headers.get('content-type', ''):
+        print(f"   [WARNING] Unexpected content type")
+        print(f"   Response: {response.text[:500]}")
+        return None
+
+    with open(case["filename"], 'wb') as f:
+        f.write(response.content)
+    print(f"   [OK] Saved as: {case['filename']}")
+    print(f"   [OK] Transfer: {len(response.content)} bytes, "
+          f"Content-Encoding: {response.headers.get('Content-Encoding', 'identity')}, "
+          f"Content-Length: {response.headers.get('Content-Length', 'n/a')}")
+    return case["filename"]
+
+
+def find_cell_adjacent(filename, needle):
+    """Return the cell next to the first cell containing `needle`.
+
+    Scans the workbook's XML directly (sharedStrings + sheet parts) with an
+    early exit, so the lookup never loads pandas or builds a DataFrame.
+    """
+    ns = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+    with zipfile.ZipFile(filename) as z:
+        strings = []
+        if "xl/sharedStrings.xml" in z.namelist():
+            with z.open("xl/sharedStrings.xml") as s:
+                strings = ["".join(t.text or "" for t in si.iter(f"{ns}t"))
+                           for si in ET.parse(s).getroot()]
+        sheets = sorted(n for n in z.namelist()
+                        if n.startswith("xl/worksheets/sheet") and n.endswith(".xml"))
+        for sheet in sheets:
+            with z.open(sheet) as s:
+                for event, el in ET.iterparse(s):
+                    if el.tag == f"{ns}row":
+                        cells = []
+                        for c in el.iter(f"{ns}c"):
+                            v = c.find(f"{ns}v")
+                            value = v.text if v is not None else ""
+                            if c.get("t") == "s" and value:
+                                value = strings[int(value)]
+                            cells.append(value or "")
+                        if cells and needle in cells[0]:
+                            return cells[1] if len(cells) > 1 else ""
+                        el.clear()
+    return None
+
+
+def analyze(filename):
+    """Scan the saved workbook for the Total Revenue row; True if non-zero."""
+    revenue_value = find_cell_adjacent(filename, 'Total Revenue')
+    if revenue_value is None:
+        print(f"   [WARNING] Could not find Total Revenue row")
+        return False
+
+    print(f"   🎯 Total Revenue in report: {revenue_value}")
+    if '$0.00' not in revenue_value and '$0' not in revenue_value:
+        print(f"   ✅ SUCCESS! Report shows non-zero revenue!")
+        return True
+    print(f"   ❌ Report still shows $0.00 revenue!")
+    return False
+
+
+def run_cases(cases):
+    """Login once, then generate and analyze every report case."""
+    results = {}
+    print("\n1. Logging in as admin...")
+    token = login()
+    if not token:
+        print("   [ERROR] Admin login failed")
+        return results
+    print(f"   [OK] Admin logged in successfully")
+
+    for i, case in enumerate(cases, start=2):
+        print(f"\n{i}. Testing report generation ({case['name']})...")
+        try:
+            filename = generate_instant(token, case)
+            results[case["name"]] = bool(filename) and analyze(filename)
+        except Exception as e:
+            print(f"   [ERROR] Test failed: {e}")
+            results[case["name"]] = False
+
+    return results
+
+
+if __name__ == "__main__":
+    print("=" * 80)
+    print("TESTING DEPLOYED REPORT GENERATION (ALL CASES)")
+    print("=" * 80)
+
+    results = run_cases(CASES)
+
+    print(f"\n" + "=" * 80)
+    print("DEPLOYED REPORT TESTS COMPLETE")
+    print("=" * 80)
+    print(f"\n🎯 FINAL SUMMARY:")
+    for name, ok in results.items():
+        print(f"   Report ({name}): {'✅ FIXED' if ok else '❌ STILL BROKEN'}")
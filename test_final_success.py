@@ -2,41 +2,81 @@
 Final test of the deployed backend with chart fixes
 """
 import requests
-import pandas as pd
+import os
+from sop_test_auth import get_token
+from urllib3.util.retry import Retry
+from openpyxl import load_workbook
 import time
 
+from sop_test_utils import KeepAliveAdapter, parse_json
+
 BASE_URL = "https://sales-and-operation-planning-platform-1.onrender.com/api/v1"
 
+# Shared session with a bounded retry policy so transient Render 502/503s
+# are retried with a short backoff instead of burning the full 60s timeout
+session = requests.Session()
+retry = Retry(
+    total=3,
+    backoff_factor=0.25,
+    status_forcelist=(502, 503, 504),
+    allowed_methods=frozenset(["GET", "POST"]),
+    raise_on_status=False,
+)
+session.mount("https://", KeepAliveAdapter(max_retries=retry, pool_maxsize=8))
+# Ask for a compressed transfer; harmless if the server sends identity
+session.headers["Accept-Encoding"] = "gzip, deflate, br"
+
+
+def api(method, path, *, token=None, json_body=None, stream=False, timeout=60):
+    """Single place for base URL, auth header, timeout and streaming."""
+    headers = {"Content-Type": "application/json"}
+    if token:
+        headers["Authorization"] = f"Bearer {token}"
+    return session.request(method, f"{BASE_URL}{path}", json=json_body,
+                           headers=headers, stream=stream, timeout=timeout)
+
+
+def wait_ready(session, url, timeout=60, interval=1.0):
+    """Poll until the backend answers below 500 (not a cold-start 502)."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            r = session.get(url, timeout=5)
+            if r.status_code < 500:
+                return True
+        except requests.RequestException:
+            pass
+        time.sleep(interval)
+    return False
+
+
 print("=" * 80)
 print("FINAL TEST: DEPLOYED BACKEND WITH CHART FIXES")
 print("=" * 80)
 
+# Set where the success is actually detected; read in the final summary
+report_ok = False
+
 # Wait for deployment
 print("\n1. Waiting for chart fixes to deploy...")
-time.sleep(30)
+if wait_ready(session, f"{BASE_URL}/auth/login"):
+    print("   [OK] Backend is ready")
+else:
+    print("   [WARNING] Backend still not ready, continuing anyway")
 
 # Login as admin
 print("\n2. Logging in as admin...")
 try:
-    admin_response = requests.post(
-        f"{BASE_URL}/auth/login",
-        json={"email": "admin@heavygarlic.com", "password": "admin123"},
-        headers={"Content-Type": "application/json"}
-    )
-    
-    admin_data = admin_response.json()
-    admin_token = admin_data.get("access_token")
+    admin_token = get_token(session, BASE_URL)
     print(f"   [OK] Admin logged in successfully")
     
     # Test sales statistics (should be working)
     print(f"\n3. Verifying sales statistics...")
-    stats_response = requests.get(
-        f"{BASE_URL}/sales-history/statistics?year=2024&month=11",
-        headers={"Authorization": f"Bearer {admin_token}"}
-    )
+    stats_response = api("GET", "/sales-history/statistics?year=2024&month=11",
+                         token=admin_token)
     
     if stats_response.status_code == 200:
-        stats_data = stats_response.json()
+        stats_data = parse_json(stats_response)
         print(f"   ✅ Sales Statistics Working:")
         print(f"     Total Revenue: ${stats_data.get('totalRevenue', 0):.2f}")
         print(f"     Total Quantity: {stats_data.get('totalQuantity', 0)}")
@@ -46,9 +86,10 @@ try:
     
     # Test report generation
     print(f"\n4. Testing report generation with chart fixes...")
-    instant_response = requests.post(
-        f"{BASE_URL}/reports/generate-instant",
-        json={
+    instant_response = api(
+        "POST", "/reports/generate-instant",
+        token=admin_token,
+        json_body={
             "reportType": "sales_summary",
             "format": "excel",
             "startDate": "2024-11-01",
@@ -56,11 +97,7 @@ try:
             "includeCharts": True,
             "includeRawData": True
         },
-        headers={
-            "Authorization": f"Bearer {admin_token}",
-            "Content-Type": "application/json"
-        },
-        timeout=60
+        stream=True
     )
     
     print(f"   Instant report status: {instant_response.status_code}")
@@ -71,44 +108,49 @@ try:
             # Save the file
             filename = "november_2024_report_FINAL_SUCCESS.xlsx"
             with open(filename, 'wb') as f:
-                f.write(instant_response.content)
+                for chunk in instant_response.iter_content(chunk_size=64 * 1024):
+                    if chunk:
+                        f.write(chunk)
             print(f"   [OK] Saved as: {filename}")
+            print(f"   [OK] Transfer: {os.path.getsize(filename)} bytes, "
+                  f"Content-Encoding: {instant_response.headers.get('Content-Encoding', 'identity')}, "
+                  f"Content-Length: {instant_response.headers.get('Content-Length', 'n/a')}")
             
             # Analyze the Excel file
             print(f"\n5. Analyzing the SUCCESSFUL report...")
             try:
-                # Read all sheets
-                excel_file = pd.ExcelFile(filename)
-                print(f"   Sheets: {excel_file.sheet_names}")
-                
-                # Check Summary sheet
-                df_summary = pd.read_excel(filename, sheet_name='Summary')
-                print(f"   Summary sheet rows: {len(df_summary)}")
-                
-                # Look for revenue values
+                # Read-only workbook: rows stream lazily, no full parse
+                wb = load_workbook(filename, read_only=True, data_only=True)
+                print(f"   Sheets: {wb.sheetnames}")
+
+                # Check the Summary sheet, stopping at the revenue row
+                ws = wb['Summary']
+                print(f"   Summary sheet rows: {ws.max_row}")
                 revenue_found = False
-                for i, row in df_summary.iterrows():
-                    if 'Total Revenue' in str(row.iloc[0]):
-                        revenue_value = str(row.iloc[1])
-                        print(f"   🎯 Total Revenue in report: {revenue_value}")
-                        if '$0.00' not in revenue_value and '$0' not in revenue_value:
-                            print(f"   ✅ SUCCESS! Report shows non-zero revenue!")
-                            revenue_found = True
-                        else:
-                            print(f"   ❌ Report still shows $0.00 revenue!")
+                revenue_value = None
+                for row in ws.iter_rows(values_only=True):
+                    if row and row[0] and 'Total Revenue' in str(row[0]):
+                        revenue_value = str(row[1])
                         break
-                
-                if not revenue_found:
+
+                if revenue_value is not None:
+                    print(f"   🎯 Total Revenue in report: {revenue_value}")
+                    if '$0.00' not in revenue_value and '$0' not in revenue_value:
+                        print(f"   ✅ SUCCESS! Report shows non-zero revenue!")
+                        revenue_found = True
+                        report_ok = True
+                    else:
+                        print(f"   ❌ Report still shows $0.00 revenue!")
+                else:
                     print(f"   [WARNING] Could not find Total Revenue row")
-                    print(f"   First few rows of summary:")
-                    print(df_summary.head().to_string())
-                
-                # Check other sheets
-                for sheet_name in excel_file.sheet_names:
+
+                # Check other sheets via row counts only
+                for sheet_name in wb.sheetnames:
                     if sheet_name != 'Summary':
-                        df_sheet = pd.read_excel(filename, sheet_name=sheet_name)
-                        print(f"   {sheet_name} sheet: {len(df_sheet)} rows")
-                        
+                        print(f"   {sheet_name} sheet: {wb[sheet_name].max_row} rows")
+
+                wb.close()
+
             except Exception as e:
                 print(f"   [ERROR] Could not analyze report: {e}")
         else:
@@ -126,7 +168,7 @@ print("=" * 80)
 
 # Final summary
 print(f"\n🎯 FINAL RESULTS:")
-if 'SUCCESS! Report shows non-zero revenue!' in str(locals()):
+if report_ok:
     print(f"✅ ISSUE RESOLVED! November 2024 reports now show correct values!")
     print(f"✅ Sales Statistics API: Working")
     print(f"✅ Sales History API: Working") 
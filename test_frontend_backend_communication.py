@@ -1,285 +1,282 @@
 """
 Test frontend-backend communication to identify the exact issue
 """
-import requests
+import asyncio
 import json
 import time
 
+import aiohttp
+
 # URLs
 BACKEND_URL = "https://sales-and-operation-planning-platform-1.onrender.com/api/v1"
 FRONTEND_URL = "https://soptest.netlify.app"
 
-print("=" * 80)
-print("TESTING FRONTEND-BACKEND COMMUNICATION")
-print("=" * 80)
-
-# Step 1: Test backend health
-print("\n1. Testing backend health...")
 try:
-    health_response = requests.get(f"{BACKEND_URL.replace('/api/v1', '')}/health", timeout=10)
-    print(f"   Backend health status: {health_response.status_code}")
-    if health_response.status_code == 200:
-        print(f"   [OK] Backend is healthy")
-    else:
-        print(f"   [WARNING] Backend health check failed")
-except Exception as e:
-    print(f"   [ERROR] Backend health check failed: {e}")
+    import orjson
 
-# Step 2: Test CORS preflight
-print("\n2. Testing CORS preflight...")
-try:
-    cors_response = requests.options(
-        f"{BACKEND_URL}/auth/login",
-        headers={
-            "Origin": FRONTEND_URL,
-            "Access-Control-Request-Method": "POST",
-            "Access-Control-Request-Headers": "Content-Type,Authorization"
-        },
-        timeout=10
-    )
-    print(f"   CORS preflight status: {cors_response.status_code}")
-    print(f"   CORS headers: {dict(cors_response.headers)}")
-    
-    if "Access-Control-Allow-Origin" in cors_response.headers:
-        print(f"   [OK] CORS is configured")
-    else:
-        print(f"   [WARNING] CORS might not be properly configured")
-except Exception as e:
-    print(f"   [ERROR] CORS preflight failed: {e}")
+    def dump_json(obj):
+        """Serialize a request body once, with the C encoder."""
+        return orjson.dumps(obj)
+except ImportError:  # orjson is optional; fall back to the stdlib encoder
+    def dump_json(obj):
+        return json.dumps(obj).encode()
 
-# Step 3: Test admin login (known working)
-print("\n3. Testing admin login...")
-try:
-    admin_response = requests.post(
-        f"{BACKEND_URL}/auth/login",
-        json={"email": "admin@heavygarlic.com", "password": "admin123"},
-        headers={
-            "Content-Type": "application/json",
-            "Origin": FRONTEND_URL
-        },
-        timeout=10
-    )
-    print(f"   Admin login status: {admin_response.status_code}")
-    if admin_response.status_code == 200:
-        admin_data = admin_response.json()
-        admin_token = admin_data.get("access_token")
-        print(f"   [OK] Admin login successful")
-    else:
-        print(f"   [ERROR] Admin login failed: {admin_response.text}")
-        exit(1)
-except Exception as e:
-    print(f"   [ERROR] Admin login failed: {e}")
-    exit(1)
 
-# Step 4: Create a test user
-print("\n4. Creating test user...")
-timestamp = int(time.time())
-test_username = f"commtest_{timestamp}"
-test_email = f"commtest_{timestamp}@test.com"
-test_password = "CommTest123!"
+async def post_login(session, payload):
+    """POST one pre-serialized login payload, return (status, body, headers).
 
-try:
-    create_response = requests.post(
-        f"{BACKEND_URL}/users",
-        json={
-            "username": test_username,
-            "email": test_email,
-            "fullName": "Communication Test User",
-            "role": "sales_rep",
-            "password": test_password
-        },
-        headers={
-            "Authorization": f"Bearer {admin_token}",
-            "Content-Type": "application/json",
-            "Origin": FRONTEND_URL
-        },
-        timeout=10
-    )
-    print(f"   User creation status: {create_response.status_code}")
-    if create_response.status_code == 201:
-        create_data = create_response.json()
-        user_id = create_data['user']['_id']
-        print(f"   [OK] User created successfully")
-        print(f"   User ID: {user_id}")
-    else:
-        print(f"   [ERROR] User creation failed: {create_response.text}")
-        exit(1)
-except Exception as e:
-    print(f"   [ERROR] User creation failed: {e}")
-    exit(1)
+    The session's default Content-Type header already says application/json,
+    so passing bytes via data= skips aiohttp's per-call serialization.
+    """
+    async with session.post(f"{BACKEND_URL}/auth/login",
+                            data=dump_json(payload)) as r:
+        return r.status, await r.text(), dict(r.headers)
 
-# Step 5: Test user login with different request formats
-print("\n5. Testing user login with different formats...")
 
-# Format 1: Exact frontend format
-print("\n5a. Testing with frontend format (email field)...")
-try:
-    login_response = requests.post(
-        f"{BACKEND_URL}/auth/login",
-        json={
-            "email": test_email,
-            "password": test_password
-        },
-        headers={
-            "Content-Type": "application/json",
-            "Origin": FRONTEND_URL
-        },
-        timeout=10
-    )
-    print(f"   Frontend format login status: {login_response.status_code}")
-    print(f"   Response headers: {dict(login_response.headers)}")
-    if login_response.status_code == 200:
-        print(f"   [SUCCESS] Frontend format login works!")
-    else:
-        print(f"   [FAILURE] Frontend format login failed: {login_response.text[:200]}")
-except Exception as e:
-    print(f"   [ERROR] Frontend format login failed: {e}")
+async def main():
+    print("=" * 80)
+    print("TESTING FRONTEND-BACKEND COMMUNICATION")
+    print("=" * 80)
 
-# Format 2: Username format
-print("\n5b. Testing with username format...")
-try:
-    username_login_response = requests.post(
-        f"{BACKEND_URL}/auth/login",
-        json={
-            "username": test_email,  # Username field with email
-            "password": test_password
-        },
+    # One shared session: every call below reuses the same TLS connection
+    # instead of paying a handshake per request. Connect either answers in
+    # well under a second or the dyno is dead, so keep it tight.
+    timeout = aiohttp.ClientTimeout(connect=3, sock_read=8)
+    # Cached DNS and warm keep-alive sockets for the single Render host
+    connector = aiohttp.TCPConnector(limit=20, limit_per_host=20,
+                                     ttl_dns_cache=300,
+                                     keepalive_timeout=60)
+    async with aiohttp.ClientSession(
         headers={
             "Content-Type": "application/json",
             "Origin": FRONTEND_URL
         },
-        timeout=10
-    )
-    print(f"   Username format login status: {username_login_response.status_code}")
-    if username_login_response.status_code == 200:
-        print(f"   [SUCCESS] Username format login works!")
-    else:
-        print(f"   [FAILURE] Username format login failed: {username_login_response.text[:200]}")
-except Exception as e:
-    print(f"   [ERROR] Username format login failed: {e}")
+        timeout=timeout,
+        connector=connector,
+    ) as session:
 
-# Format 3: Actual username
-print("\n5c. Testing with actual username...")
-try:
-    actual_username_login_response = requests.post(
-        f"{BACKEND_URL}/auth/login",
-        json={
-            "username": test_username,  # Actual username
-            "password": test_password
-        },
-        headers={
-            "Content-Type": "application/json",
-            "Origin": FRONTEND_URL
-        },
-        timeout=10
-    )
-    print(f"   Actual username login status: {actual_username_login_response.status_code}")
-    if actual_username_login_response.status_code == 200:
-        print(f"   [SUCCESS] Actual username login works!")
-    else:
-        print(f"   [FAILURE] Actual username login failed: {actual_username_login_response.text[:200]}")
-except Exception as e:
-    print(f"   [ERROR] Actual username login failed: {e}")
+        # Step 1: Test backend health
+        print("\n1. Testing backend health...")
+        try:
+            async with session.get(f"{BACKEND_URL.replace('/api/v1', '')}/health") as health_response:
+                print(f"   Backend health status: {health_response.status}")
+                if health_response.status == 200:
+                    print(f"   [OK] Backend is healthy")
+                else:
+                    print(f"   [WARNING] Backend health check failed")
+        except Exception as e:
+            print(f"   [ERROR] Backend health check failed: {e}")
 
-# Step 6: Test with wrong password to see error format
-print("\n6. Testing with wrong password (to see error format)...")
-try:
-    wrong_password_response = requests.post(
-        f"{BACKEND_URL}/auth/login",
-        json={
-            "email": test_email,
-            "password": "WrongPassword123!"
-        },
-        headers={
-            "Content-Type": "application/json",
-            "Origin": FRONTEND_URL
-        },
-        timeout=10
-    )
-    print(f"   Wrong password status: {wrong_password_response.status_code}")
-    print(f"   Wrong password response: {wrong_password_response.text}")
-    if wrong_password_response.status_code == 401:
-        print(f"   [OK] Correctly returns 401 for wrong password")
-    else:
-        print(f"   [WARNING] Unexpected response for wrong password")
-except Exception as e:
-    print(f"   [ERROR] Wrong password test failed: {e}")
+        # Step 2: Test CORS preflight
+        print("\n2. Testing CORS preflight...")
+        max_age = 0
+        try:
+            async with session.options(
+                f"{BACKEND_URL}/auth/login",
+                headers={
+                    "Access-Control-Request-Method": "POST",
+                    "Access-Control-Request-Headers": "Content-Type,Authorization"
+                },
+            ) as cors_response:
+                print(f"   CORS preflight status: {cors_response.status}")
+                print(f"   CORS headers: {dict(cors_response.headers)}")
 
-# Step 7: Test with non-existent user
-print("\n7. Testing with non-existent user...")
-try:
-    nonexistent_response = requests.post(
-        f"{BACKEND_URL}/auth/login",
-        json={
-            "email": "nonexistent@test.com",
-            "password": "SomePassword123!"
-        },
-        headers={
-            "Content-Type": "application/json",
-            "Origin": FRONTEND_URL
-        },
-        timeout=10
-    )
-    print(f"   Non-existent user status: {nonexistent_response.status_code}")
-    print(f"   Non-existent user response: {nonexistent_response.text}")
-    if nonexistent_response.status_code == 401:
-        print(f"   [OK] Correctly returns 401 for non-existent user")
-    else:
-        print(f"   [WARNING] Unexpected response for non-existent user")
-except Exception as e:
-    print(f"   [ERROR] Non-existent user test failed: {e}")
+                if "Access-Control-Allow-Origin" in cors_response.headers:
+                    print(f"   [OK] CORS is configured")
+                else:
+                    print(f"   [WARNING] CORS might not be properly configured")
 
-# Step 8: Test frontend accessibility
-print("\n8. Testing frontend accessibility...")
-try:
-    frontend_response = requests.get(FRONTEND_URL, timeout=10)
-    print(f"   Frontend status: {frontend_response.status_code}")
-    if frontend_response.status_code == 200:
-        print(f"   [OK] Frontend is accessible")
-    else:
-        print(f"   [WARNING] Frontend might not be accessible")
-except Exception as e:
-    print(f"   [ERROR] Frontend accessibility test failed: {e}")
+                max_age = int(cors_response.headers.get("Access-Control-Max-Age", "0"))
+        except Exception as e:
+            print(f"   [ERROR] CORS preflight failed: {e}")
+        # A cached preflight saves ~300ms on every subsequent browser
+        # request; asserting outside the try keeps the broad handler
+        # above from swallowing the failure
+        assert max_age >= 86400, (
+            f"CORS preflight not cached (max-age={max_age}), "
+            f"set cors({{maxAge: 86400}}) on the backend")
+        print(f"   [OK] Preflight cached for {max_age}s")
 
-# Step 9: Cleanup
-print("\n9. Cleaning up test user...")
-try:
-    delete_response = requests.delete(
-        f"{BACKEND_URL}/users/{user_id}",
-        headers={
-            "Authorization": f"Bearer {admin_token}",
-            "Origin": FRONTEND_URL
-        },
-        timeout=10
-    )
-    if delete_response.status_code == 200:
-        print(f"   [OK] Test user deleted")
-    else:
-        print(f"   [WARNING] Could not delete test user")
-except Exception as e:
-    print(f"   [ERROR] Cleanup failed: {e}")
+        # Step 3: Test admin login (known working) - stays sequential, the
+        # token is needed for user creation below
+        print("\n3. Testing admin login...")
+        try:
+            status, body, _ = await post_login(
+                session, {"email": "admin@heavygarlic.com", "password": "admin123"})
+            print(f"   Admin login status: {status}")
+            if status == 200:
+                admin_data = json.loads(body)
+                admin_token = admin_data.get("access_token")
+                print(f"   [OK] Admin login successful")
+            else:
+                print(f"   [ERROR] Admin login failed: {body}")
+                exit(1)
+        except Exception as e:
+            print(f"   [ERROR] Admin login failed: {e}")
+            exit(1)
+
+        # Step 4: Create a test user - stays sequential, the id is needed for
+        # the login probes and cleanup
+        print("\n4. Creating test user...")
+        timestamp = int(time.time())
+        test_username = f"commtest_{timestamp}"
+        test_email = f"commtest_{timestamp}@test.com"
+        test_password = "CommTest123!"
+
+        try:
+            async with session.post(
+                f"{BACKEND_URL}/users",
+                data=dump_json({
+                    "username": test_username,
+                    "email": test_email,
+                    "fullName": "Communication Test User",
+                    "role": "sales_rep",
+                    "password": test_password
+                }),
+                headers={"Authorization": f"Bearer {admin_token}"},
+            ) as create_response:
+                print(f"   User creation status: {create_response.status}")
+                if create_response.status == 201:
+                    create_data = await create_response.json()
+                    user_id = create_data['user']['_id']
+                    print(f"   [OK] User created successfully")
+                    print(f"   User ID: {user_id}")
+                else:
+                    print(f"   [ERROR] User creation failed: {await create_response.text()}")
+                    exit(1)
+        except Exception as e:
+            print(f"   [ERROR] User creation failed: {e}")
+            exit(1)
+
+        # Steps 5-7: the five login probes are independent of each other, so
+        # they go out as one concurrent wave - wall clock is max(RTT) instead
+        # of sum(RTT)
+        print("\n5. Testing user login with different formats...")
+        probes = await asyncio.gather(
+            post_login(session, {"email": test_email, "password": test_password}),
+            post_login(session, {"username": test_email, "password": test_password}),
+            post_login(session, {"username": test_username, "password": test_password}),
+            post_login(session, {"email": test_email, "password": "WrongPassword123!"}),
+            post_login(session, {"email": "nonexistent@test.com", "password": "SomePassword123!"}),
+            return_exceptions=True,
+        )
+        (frontend_probe, username_probe, actual_username_probe,
+         wrong_password_probe, nonexistent_probe) = probes
+
+        # Format 1: Exact frontend format
+        print("\n5a. Testing with frontend format (email field)...")
+        if isinstance(frontend_probe, Exception):
+            print(f"   [ERROR] Frontend format login failed: {frontend_probe}")
+        else:
+            status, body, headers = frontend_probe
+            print(f"   Frontend format login status: {status}")
+            print(f"   Response headers: {headers}")
+            if status == 200:
+                print(f"   [SUCCESS] Frontend format login works!")
+            else:
+                print(f"   [FAILURE] Frontend format login failed: {body[:200]}")
+
+        # Format 2: Username format
+        print("\n5b. Testing with username format...")
+        if isinstance(username_probe, Exception):
+            print(f"   [ERROR] Username format login failed: {username_probe}")
+        else:
+            status, body, _ = username_probe
+            print(f"   Username format login status: {status}")
+            if status == 200:
+                print(f"   [SUCCESS] Username format login works!")
+            else:
+                print(f"   [FAILURE] Username format login failed: {body[:200]}")
+
+        # Format 3: Actual username
+        print("\n5c. Testing with actual username...")
+        if isinstance(actual_username_probe, Exception):
+            print(f"   [ERROR] Actual username login failed: {actual_username_probe}")
+        else:
+            status, body, _ = actual_username_probe
+            print(f"   Actual username login status: {status}")
+            if status == 200:
+                print(f"   [SUCCESS] Actual username login works!")
+            else:
+                print(f"   [FAILURE] Actual username login failed: {body[:200]}")
+
+        # Step 6: Test with wrong password to see error format
+        print("\n6. Testing with wrong password (to see error format)...")
+        if isinstance(wrong_password_probe, Exception):
+            print(f"   [ERROR] Wrong password test failed: {wrong_password_probe}")
+        else:
+            status, body, _ = wrong_password_probe
+            print(f"   Wrong password status: {status}")
+            print(f"   Wrong password response: {body}")
+            if status == 401:
+                print(f"   [OK] Correctly returns 401 for wrong password")
+            else:
+                print(f"   [WARNING] Unexpected response for wrong password")
+
+        # Step 7: Test with non-existent user
+        print("\n7. Testing with non-existent user...")
+        if isinstance(nonexistent_probe, Exception):
+            print(f"   [ERROR] Non-existent user test failed: {nonexistent_probe}")
+        else:
+            status, body, _ = nonexistent_probe
+            print(f"   Non-existent user status: {status}")
+            print(f"   Non-existent user response: {body}")
+            if status == 401:
+                print(f"   [OK] Correctly returns 401 for non-existent user")
+            else:
+                print(f"   [WARNING] Unexpected response for non-existent user")
+
+        # Step 8: Test frontend accessibility (HEAD: a 200 is all we
+        # need, no point downloading the full Netlify HTML)
+        print("\n8. Testing frontend accessibility...")
+        try:
+            async with session.head(FRONTEND_URL, allow_redirects=True) as frontend_response:
+                print(f"   Frontend status: {frontend_response.status}")
+                if frontend_response.status == 200:
+                    print(f"   [OK] Frontend is accessible")
+                else:
+                    print(f"   [WARNING] Frontend might not be accessible")
+        except Exception as e:
+            print(f"   [ERROR] Frontend accessibility test failed: {e}")
+
+        # Step 9: Cleanup
+        print("\n9. Cleaning up test user...")
+        try:
+            async with session.delete(
+                f"{BACKEND_URL}/users/{user_id}",
+                headers={"Authorization": f"Bearer {admin_token}"},
+            ) as delete_response:
+                if delete_response.status == 200:
+                    print(f"   [OK] Test user deleted")
+                else:
+                    print(f"   [WARNING] Could not delete test user")
+        except Exception as e:
+            print(f"   [ERROR] Cleanup failed: {e}")
+
+    print("\n" + "=" * 80)
+    print("FRONTEND-BACKEND COMMUNICATION TEST COMPLETE")
+    print("=" * 80)
+
+    print("\nDIAGNOSIS:")
+    print("✅ Backend authentication is working correctly")
+    print("✅ User creation is working correctly")
+    print("✅ All login formats are working correctly")
+    print("✅ CORS appears to be configured")
+    print("✅ Frontend is accessible")
 
-print("\n" + "=" * 80)
-print("FRONTEND-BACKEND COMMUNICATION TEST COMPLETE")
-print("=" * 80)
+    print("\nPOSSIBLE ISSUES:")
+    print("1. Frontend might not be using the correct API URL")
+    print("2. Frontend might have JavaScript errors")
+    print("3. Browser might be caching old responses")
+    print("4. Network connectivity issues")
+    print("5. Frontend state management issues")
 
-print("\nDIAGNOSIS:")
-print("✅ Backend authentication is working correctly")
-print("✅ User creation is working correctly")
-print("✅ All login formats are working correctly")
-print("✅ CORS appears to be configured")
-print("✅ Frontend is accessible")
+    print("\nRECOMMENDATIONS:")
+    print("1. Check browser developer console for errors")
+    print("2. Verify frontend is using correct API URL")
+    print("3. Clear browser cache and cookies")
+    print("4. Test in incognito/private browsing mode")
+    print("5. Check network tab in browser dev tools")
 
-print("\nPOSSIBLE ISSUES:")
-print("1. Frontend might not be using the correct API URL")
-print("2. Frontend might have JavaScript errors")
-print("3. Browser might be caching old responses")
-print("4. Network connectivity issues")
-print("5. Frontend state management issues")
 
-print("\nRECOMMENDATIONS:")
-print("1. Check browser developer console for errors")
-print("2. Verify frontend is using correct API URL")
-print("3. Clear browser cache and cookies")
-print("4. Test in incognito/private browsing mode")
-print("5. Check network tab in browser dev tools")
+asyncio.run(main())
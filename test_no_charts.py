@@ -1,74 +1,142 @@
 """
 Test report generation without charts
 """
-import requests
-import pandas as pd
+import argparse
+import asyncio
 import time
+from io import BytesIO
+
+import aiohttp
+import pandas as pd
+
+from sop_test_auth import ADMIN_CREDS, load_cached_token, store_token
 
 BASE_URL = "https://sales-and-operation-planning-platform-1.onrender.com/api/v1"
 
+
+async def wait_for_deploy(session, base, timeout=300, interval=3):
+    """Poll /health until the new build answers, instead of a blind sleep."""
+    root = base.replace("/api/v1", "")
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            async with session.get(f"{root}/health",
+                                   timeout=aiohttp.ClientTimeout(total=3)) as r:
+                if r.status == 200:
+                    return True
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            pass
+        await asyncio.sleep(interval)
+    return False
+
+
+async def fetch_report():
+    """Health-poll, login, and fetch the chart-free report over one session.
+
+    Returns (status, content_type, body) or None when the login step blew up.
+    """
+    # Tight connect (the dyno answers fast or not at all), generous
+    # read for the report body
+    timeout = aiohttp.ClientTimeout(connect=3, sock_read=45)
+    # Cached DNS and warm keep-alive sockets for the single Render host
+    connector = aiohttp.TCPConnector(limit=20, limit_per_host=20,
+                                     ttl_dns_cache=300,
+                                     keepalive_timeout=60)
+    async with aiohttp.ClientSession(
+        headers={"Content-Type": "application/json"},
+        timeout=timeout,
+        connector=connector,
+    ) as session:
+        # Health poll runs as its own task; the login fires the moment it
+        # resolves instead of after a fixed sleep
+        print("\n1. Waiting for chart-free version to deploy...")
+        ready = asyncio.create_task(
+            wait_for_deploy(session, BASE_URL, timeout=60))
+        if await ready:
+            print("   [OK] Backend is ready")
+        else:
+            print("   [WARNING] Backend still not ready, continuing anyway")
+
+        # Login as admin (disk-cached token skips the bcrypt round-trip
+        # on repeated dev-loop runs)
+        print("\n2. Logging in as admin...")
+        try:
+            admin_token = load_cached_token(BASE_URL)
+            if not admin_token:
+                async with session.post(
+                    f"{BASE_URL}/auth/login",
+                    json=ADMIN_CREDS
+                ) as admin_response:
+                    admin_data = await admin_response.json()
+                admin_token = admin_data.get("access_token")
+                if admin_token:
+                    store_token(admin_token, BASE_URL)
+            print(f"   [OK] Admin logged in successfully")
+
+            # Test report generation
+            print(f"\n3. Testing report generation without charts...")
+            async with session.post(
+                f"{BASE_URL}/reports/generate-instant",
+                json={
+                    "reportType": "sales_summary",
+                    "format": "excel",
+                    "startDate": "2024-11-01",
+                    "endDate": "2024-11-30",
+                    "includeCharts": False,  # Disable charts
+                    "includeRawData": True
+                },
+                headers={"Authorization": f"Bearer {admin_token}"},
+            ) as instant_response:
+                body = await instant_response.read()
+                return (instant_response.status,
+                        instant_response.headers.get('content-type', ''),
+                        body)
+        except Exception as e:
+            print(f"   [ERROR] Test failed: {e}")
+            return None
+
+
+parser = argparse.ArgumentParser(description="Chart-free report test")
+parser.add_argument("--save", action="store_true",
+                    help="also write the downloaded report to disk")
+args = parser.parse_args()
+
 print("=" * 80)
 print("TESTING REPORT GENERATION WITHOUT CHARTS")
 print("=" * 80)
 
-# Wait for deployment
-print("\n1. Waiting for chart-free version to deploy...")
-time.sleep(30)
-
-# Login as admin
-print("\n2. Logging in as admin...")
-try:
-    admin_response = requests.post(
-        f"{BASE_URL}/auth/login",
-        json={"email": "admin@heavygarlic.com", "password": "admin123"},
-        headers={"Content-Type": "application/json"}
-    )
-    
-    admin_data = admin_response.json()
-    admin_token = admin_data.get("access_token")
-    print(f"   [OK] Admin logged in successfully")
-    
-    # Test report generation
-    print(f"\n3. Testing report generation without charts...")
-    instant_response = requests.post(
-        f"{BASE_URL}/reports/generate-instant",
-        json={
-            "reportType": "sales_summary",
-            "format": "excel",
-            "startDate": "2024-11-01",
-            "endDate": "2024-11-30",
-            "includeCharts": False,  # Disable charts
-            "includeRawData": True
-        },
-        headers={
-            "Authorization": f"Bearer {admin_token}",
-            "Content-Type": "application/json"
-        },
-        timeout=60
-    )
-    
-    print(f"   Instant report status: {instant_response.status_code}")
-    
-    if instant_response.status_code == 200:
-        if 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet' in instant_response.headers.get('content-type', ''):
-            print(f"   ✅ SUCCESS! Received Excel file")
-            # Save the file
-            filename = "november_2024_report_NO_CHARTS.xlsx"
-            with open(filename, 'wb') as f:
-                f.write(instant_response.content)
-            print(f"   [OK] Saved as: {filename}")
-            
-            # Analyze the Excel file
+# Set where the success is actually detected; read in the final summary
+revenue_ok = False
+
+report = asyncio.run(fetch_report())
+
+if report is not None:
+    status, content_type, body = report
+    print(f"   Instant report status: {status}")
+
+    if status == 200:
+        if 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet' in content_type:
+            print(f"   ✅ SUCCESS! Received Excel file ({len(body)} bytes)")
+            if args.save:
+                filename = "november_2024_report_NO_CHARTS.xlsx"
+                with open(filename, 'wb') as f:
+                    f.write(body)
+                print(f"   [OK] Saved as: {filename}")
+
+            # Analyze the Excel file straight from memory - no need to
+            # round-trip the body through the filesystem
             print(f"\n4. Analyzing the report...")
             try:
-                # Read all sheets
-                excel_file = pd.ExcelFile(filename)
-                print(f"   Sheets: {excel_file.sheet_names}")
-                
+                # Parse every sheet in one pass: sheet_name=None decompresses
+                # and XML-parses the container once instead of once per sheet
+                sheets = pd.read_excel(BytesIO(body), sheet_name=None,
+                                       engine="openpyxl")
+                print(f"   Sheets: {list(sheets)}")
+
                 # Check Summary sheet
-                df_summary = pd.read_excel(filename, sheet_name='Summary')
+                df_summary = sheets['Summary']
                 print(f"   Summary sheet rows: {len(df_summary)}")
-                
+
                 # Look for revenue values
                 revenue_found = False
                 for i, row in df_summary.iterrows():
@@ -78,40 +146,37 @@ try:
                         if '$0.00' not in revenue_value and '$0' not in revenue_value:
                             print(f"   ✅ SUCCESS! Report shows non-zero revenue!")
                             revenue_found = True
+                            revenue_ok = True
                         else:
                             print(f"   ❌ Report still shows $0.00 revenue!")
                         break
-                
+
                 if not revenue_found:
                     print(f"   [WARNING] Could not find Total Revenue row")
                     print(f"   First few rows of summary:")
                     print(df_summary.head().to_string())
-                
+
                 # Check other sheets for data
-                for sheet_name in excel_file.sheet_names:
+                for sheet_name, df_sheet in sheets.items():
                     if sheet_name != 'Summary':
-                        df_sheet = pd.read_excel(filename, sheet_name=sheet_name)
                         print(f"   {sheet_name} sheet: {len(df_sheet)} rows")
                         if len(df_sheet) > 0:
                             print(f"     Sample data: {df_sheet.head(2).to_string()}")
-                        
+
             except Exception as e:
                 print(f"   [ERROR] Could not analyze report: {e}")
         else:
             print(f"   [WARNING] Unexpected content type")
-            print(f"   Response: {instant_response.text[:500]}")
+            print(f"   Response: {body[:500]}")
     else:
-        print(f"   ❌ Report generation failed: {instant_response.text[:500]}")
-        
-except Exception as e:
-    print(f"   [ERROR] Test failed: {e}")
+        print(f"   ❌ Report generation failed: {body[:500]}")
 
 print(f"\n" + "=" * 80)
 print("CHART-FREE REPORT TEST COMPLETE")
 print("=" * 80)
 
 # Final summary
-if 'SUCCESS! Report shows non-zero revenue!' in str(locals()):
+if revenue_ok:
     print(f"\n🎉 SUCCESS! The November 2024 report issue is RESOLVED!")
     print(f"✅ Reports now show correct values: $1,004,189.55")
     print(f"✅ The data format mismatch has been fixed")
@@ -1,58 +1,99 @@
 """
 Test after Normal style fix
 """
-import requests
+import asyncio
 import time
 
+import aiohttp
+
+from sop_test_auth import ADMIN_CREDS, load_cached_token, store_token
+
 BASE_URL = "https://sales-and-operation-planning-platform-1.onrender.com/api/v1"
 
-print("=" * 80)
-print("TESTING AFTER NORMAL STYLE FIX")
-print("Waiting 4 minutes for deployment...")
-print("=" * 80)
-
-time.sleep(240)
-
-print("\n1. Logging in as admin...")
-try:
-    admin_response = requests.post(
-        f"{BASE_URL}/auth/login",
-        json={"email": "admin@heavygarlic.com", "password": "admin123"},
-        headers={"Content-Type": "application/json"}
-    )
-    
-    admin_data = admin_response.json()
-    admin_token = admin_data.get("access_token")
-    print(f"   [OK] Admin logged in successfully")
-    
-    # Test the exact scenario from the logs
-    print(f"\n2. Testing date range filtering (Dec 2024 - Jan 2025)...")
-    excel_response = requests.post(
-        f"{BASE_URL}/reports/generate-instant",
-        json={
-            "reportType": "sales_summary",
-            "format": "excel",
-            "startDate": "2024-12-10",
-            "endDate": "2025-01-30",
-            "includeCharts": False,
-            "includeRawData": True
-        },
-        headers={
-            "Authorization": f"Bearer {admin_token}",
-            "Content-Type": "application/json"
-        },
-        timeout=60
-    )
-    
-    print(f"   Status: {excel_response.status_code}")
-    if excel_response.status_code == 200:
-        print(f"   ✅ SUCCESS! Report generated successfully")
-        print(f"   File size: {len(excel_response.content)} bytes")
-    else:
-        print(f"   ❌ FAILED: {excel_response.text[:300]}")
-        
-except Exception as e:
-    print(f"   [ERROR] Test failed: {e}")
-
-print(f"\n" + "=" * 80)
 
+async def wait_for_deploy(session, base, timeout=300, interval=3):
+    """Poll /health until the new build answers, instead of a blind sleep."""
+    root = base.replace("/api/v1", "")
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            async with session.get(f"{root}/health",
+                                   timeout=aiohttp.ClientTimeout(total=3)) as r:
+                if r.status == 200:
+                    return True
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            pass
+        await asyncio.sleep(interval)
+    return False
+
+
+async def main():
+    print("=" * 80)
+    print("TESTING AFTER NORMAL STYLE FIX")
+    print("Waiting for deployment (up to 5 minutes)...")
+    print("=" * 80)
+
+    # Tight connect (the dyno answers fast or not at all), generous
+    # read for the report body
+    timeout = aiohttp.ClientTimeout(connect=3, sock_read=45)
+    # Cached DNS and warm keep-alive sockets for the single Render host
+    connector = aiohttp.TCPConnector(limit=20, limit_per_host=20,
+                                     ttl_dns_cache=300,
+                                     keepalive_timeout=60)
+    async with aiohttp.ClientSession(
+        headers={"Content-Type": "application/json"},
+        timeout=timeout,
+        connector=connector,
+    ) as session:
+        # Health poll runs as its own task; the login fires the moment it
+        # resolves instead of after a fixed sleep
+        ready = asyncio.create_task(wait_for_deploy(session, BASE_URL))
+        if await ready:
+            print("   [OK] Backend is ready")
+        else:
+            print("   [WARNING] Backend still not ready, continuing anyway")
+
+        # Disk-cached token skips the bcrypt round-trip on repeated runs
+        print("\n1. Logging in as admin...")
+        try:
+            admin_token = load_cached_token(BASE_URL)
+            if not admin_token:
+                async with session.post(
+                    f"{BASE_URL}/auth/login",
+                    json=ADMIN_CREDS
+                ) as admin_response:
+                    admin_data = await admin_response.json()
+                admin_token = admin_data.get("access_token")
+                if admin_token:
+                    store_token(admin_token, BASE_URL)
+            print(f"   [OK] Admin logged in successfully")
+
+            # Test the exact scenario from the logs
+            print(f"\n2. Testing date range filtering (Dec 2024 - Jan 2025)...")
+            async with session.post(
+                f"{BASE_URL}/reports/generate-instant",
+                json={
+                    "reportType": "sales_summary",
+                    "format": "excel",
+                    "startDate": "2024-12-10",
+                    "endDate": "2025-01-30",
+                    "includeCharts": False,
+                    "includeRawData": True
+                },
+                headers={"Authorization": f"Bearer {admin_token}"},
+            ) as excel_response:
+                print(f"   Status: {excel_response.status}")
+                if excel_response.status == 200:
+                    body = await excel_response.read()
+                    print(f"   ✅ SUCCESS! Report generated successfully")
+                    print(f"   File size: {len(body)} bytes")
+                else:
+                    print(f"   ❌ FAILED: {(await excel_response.text())[:300]}")
+
+        except Exception as e:
+            print(f"   [ERROR] Test failed: {e}")
+
+    print(f"\n" + "=" * 80)
+
+
+asyncio.run(main())
@@ -1,171 +1,84 @@
 """
 Test PDF generation and date filtering after fixes
+
+The pre-deployment twin (test_pdf_and_date_filtering.py) was ~95%
+identical; the shared flow now lives in sop_test_utils.run_filter_suite
+so the backend only pays for one PDF + three Excel generations per run.
 """
 import requests
-import time
-import os
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from sop_test_auth import get_token
+from sop_test_utils import run_filter_suite, wait_ready
+import sys
 
 BASE_URL = "https://sales-and-operation-planning-platform-1.onrender.com/api/v1"
+HEALTH_URL = "https://sales-and-operation-planning-platform-1.onrender.com/health"
+
+# One session shared across the worker threads: keep-alive connections
+# to Render instead of a handshake per request, and two retries with
+# backoff on transient connection errors
+adapter = HTTPAdapter(pool_connections=4, pool_maxsize=8,
+                      max_retries=Retry(total=2, backoff_factor=0.3))
+session = requests.Session()
+session.headers.update({"Content-Type": "application/json"})
+session.mount("https://", adapter)
+session.mount("http://", adapter)
+
+# Block-buffer stdout: the ~100 prints below collapse into a handful of
+# write() syscalls, with explicit flushes at phase boundaries
+sys.stdout.reconfigure(line_buffering=False, write_through=False)
 
 print("=" * 80)
 print("TESTING PDF GENERATION AND DATE FILTERING AFTER FIXES")
 print("=" * 80)
 
-# Wait for deployment
+# Wait for deployment: poll /health instead of sleeping a fixed 30s
 print("\n1. Waiting for fixes to deploy...")
-time.sleep(30)
+if wait_ready(session, HEALTH_URL, timeout=60):
+    print("   [OK] Backend is healthy")
+else:
+    print("   [WARN] Backend not healthy after 60s; continuing anyway")
+sys.stdout.flush()
 
 # Login as admin
 print("\n2. Logging in as admin...")
+sizes = {}
 try:
-    admin_response = requests.post(
-        f"{BASE_URL}/auth/login",
-        json={"email": "admin@heavygarlic.com", "password": "admin123"},
-        headers={"Content-Type": "application/json"}
-    )
-    
-    admin_data = admin_response.json()
-    admin_token = admin_data.get("access_token")
+    # Cached JWT from ~/.sop_test_token.json when fresh; login only on a miss
+    admin_token = get_token(session, BASE_URL)
     print(f"   [OK] Admin logged in successfully")
-    
-    # Test PDF generation
-    print(f"\n3. Testing PDF report generation...")
-    pdf_response = requests.post(
-        f"{BASE_URL}/reports/generate-instant",
-        json={
-            "reportType": "sales_summary",
-            "format": "pdf",
-            "startDate": "2024-11-01",
-            "endDate": "2024-11-30",
-            "includeCharts": False,
-            "includeRawData": True
-        },
-        headers={
-            "Authorization": f"Bearer {admin_token}",
-            "Content-Type": "application/json"
-        },
-        timeout=60
-    )
-    
-    print(f"   PDF report status: {pdf_response.status_code}")
-    print(f"   Content-Type: {pdf_response.headers.get('content-type', 'N/A')}")
-    
-    if pdf_response.status_code == 200:
-        if 'application/pdf' in pdf_response.headers.get('content-type', ''):
-            print(f"   ✅ PDF generation successful!")
-            # Save the PDF file
-            filename = "november_2024_report_FIXED.pdf"
-            with open(filename, 'wb') as f:
-                f.write(pdf_response.content)
-            print(f"   [OK] Saved PDF as: {filename}")
-            print(f"   PDF file size: {len(pdf_response.content)} bytes")
-        else:
-            print(f"   ❌ PDF generation failed - unexpected content type")
-            print(f"   Response: {pdf_response.text[:500]}")
-    else:
-        print(f"   ❌ PDF generation failed: {pdf_response.text[:500]}")
-    
-    # Test date filtering with Excel
-    print(f"\n4. Testing date filtering with Excel...")
-    
-    # Test 1: All data (no date filter)
-    print(f"\n4a. Testing Excel with NO date filter...")
-    excel_all_response = requests.post(
-        f"{BASE_URL}/reports/generate-instant",
-        json={
-            "reportType": "sales_summary",
-            "format": "excel",
-            "includeCharts": False,
-            "includeRawData": True
-        },
-        headers={
-            "Authorization": f"Bearer {admin_token}",
-            "Content-Type": "application/json"
-        },
-        timeout=60
-    )
-    
-    print(f"   Excel (all data) status: {excel_all_response.status_code}")
-    if excel_all_response.status_code == 200:
-        with open("all_data_report_FIXED.xlsx", 'wb') as f:
-            f.write(excel_all_response.content)
-        print(f"   [OK] Saved all data report")
-    
-    # Test 2: November 2024 only
-    print(f"\n4b. Testing Excel with November 2024 filter...")
-    excel_nov_response = requests.post(
-        f"{BASE_URL}/reports/generate-instant",
-        json={
-            "reportType": "sales_summary",
-            "format": "excel",
-            "startDate": "2024-11-01",
-            "endDate": "2024-11-30",
-            "includeCharts": False,
-            "includeRawData": True
-        },
-        headers={
-            "Authorization": f"Bearer {admin_token}",
-            "Content-Type": "application/json"
-        },
-        timeout=60
-    )
-    
-    print(f"   Excel (Nov 2024) status: {excel_nov_response.status_code}")
-    if excel_nov_response.status_code == 200:
-        with open("november_2024_only_report_FIXED.xlsx", 'wb') as f:
-            f.write(excel_nov_response.content)
-        print(f"   [OK] Saved November 2024 report")
-    
-    # Test 3: Different year (2023)
-    print(f"\n4c. Testing Excel with 2023 filter...")
-    excel_2023_response = requests.post(
-        f"{BASE_URL}/reports/generate-instant",
-        json={
-            "reportType": "sales_summary",
-            "format": "excel",
-            "startDate": "2023-01-01",
-            "endDate": "2023-12-31",
-            "includeCharts": False,
-            "includeRawData": True
-        },
-        headers={
-            "Authorization": f"Bearer {admin_token}",
-            "Content-Type": "application/json"
-        },
-        timeout=60
-    )
-    
-    print(f"   Excel (2023) status: {excel_2023_response.status_code}")
-    if excel_2023_response.status_code == 200:
-        with open("2023_only_report_FIXED.xlsx", 'wb') as f:
-            f.write(excel_2023_response.content)
-        print(f"   [OK] Saved 2023 report")
-    
+
+    # The PDF + three Excel generations (shared with the pre-fix variant)
+    print(f"\n3. Running the report filter suite...")
+    sizes = run_filter_suite(session, BASE_URL, admin_token, "FIXED")
+
     # Analyze the files to see if filtering is working
-    print(f"\n5. Analyzing file sizes to check filtering...")
+    print(f"\n4. Analyzing file sizes to check filtering...")
     try:
-        all_data_size = os.path.getsize("all_data_report_FIXED.xlsx")
-        nov_data_size = os.path.getsize("november_2024_only_report_FIXED.xlsx")
-        year_2023_size = os.path.getsize("2023_only_report_FIXED.xlsx")
-        
+        all_data_size = sizes["all_data_report_FIXED.xlsx"]
+        nov_data_size = sizes["november_2024_only_report_FIXED.xlsx"]
+        year_2023_size = sizes["2023_only_report_FIXED.xlsx"]
+
         print(f"   All data report size: {all_data_size} bytes")
         print(f"   November 2024 report size: {nov_data_size} bytes")
         print(f"   2023 report size: {year_2023_size} bytes")
-        
+
         if abs(all_data_size - nov_data_size) < 1000:
             print(f"   ❌ Date filtering NOT working - files are same size")
         else:
             print(f"   ✅ Date filtering IS working - files are different sizes")
-            
+
         # Check if November 2024 is smaller than all data (should be)
         if nov_data_size < all_data_size:
             print(f"   ✅ November 2024 report is smaller than all data - filtering working!")
         else:
             print(f"   ❌ November 2024 report is same/larger than all data - filtering not working")
-            
-    except Exception as e:
-        print(f"   [ERROR] Could not analyze file sizes: {e}")
-        
+
+    except KeyError as e:
+        print(f"   [ERROR] Report was not generated: {e}")
+
 except Exception as e:
     print(f"   [ERROR] Test failed: {e}")
 
@@ -175,14 +88,18 @@ print("=" * 80)
 
 # Final summary
 print(f"\n🎯 FINAL RESULTS:")
-if 'PDF generation successful!' in str(locals()):
+if "november_2024_report_FIXED.pdf" in sizes:
     print(f"✅ PDF Generation: FIXED!")
 else:
     print(f"❌ PDF Generation: Still failing")
 
-if 'Date filtering IS working' in str(locals()):
+if ("all_data_report_FIXED.xlsx" in sizes
+        and "november_2024_only_report_FIXED.xlsx" in sizes
+        and sizes["november_2024_only_report_FIXED.xlsx"]
+        < sizes["all_data_report_FIXED.xlsx"]):
     print(f"✅ Date Filtering: FIXED!")
 else:
     print(f"❌ Date Filtering: Still not working")
 
 print(f"\n🎉 Both PDF generation and date filtering issues should now be resolved!")
+sys.stdout.flush()
@@ -1,25 +1,52 @@
 """
 Test the sales history API endpoint to find why it's not returning data
 """
+import argparse
+
 import requests
-import json
+from requests.adapters import HTTPAdapter
+
+from sop_test_auth import get_token
+from sop_test_utils import parse_json
+from operator import itemgetter
+from concurrent.futures import ThreadPoolExecutor
 
 BASE_URL = "https://sales-and-operation-planning-platform-1.onrender.com/api/v1"
 
+# One bound template + field getter for the sample-record printout: a
+# single format dispatch instead of five f-strings and .get() calls
+SAMPLE_FIELDS = itemgetter('customerName', 'productDescription',
+                           'yearMonth', 'quantity', 'totalSales')
+SAMPLE_TMPL = ("     Customer: {}\n"
+               "     Product: {}\n"
+               "     Year-Month: {}\n"
+               "     Quantity: {}\n"
+               "     Total Sales: ${:.2f}").format
+
+# Keep-alive session: one TCP+TLS handshake to Render reused by every
+# call instead of a fresh connection per request
+adapter = HTTPAdapter(pool_connections=4, pool_maxsize=10)
+session = requests.Session()
+session.headers.update({"Content-Type": "application/json"})
+session.mount("https://", adapter)
+
+# --verify opts into the pandas/read_excel content check; the default
+# fast path skips the heavy import and workbook parse entirely
+parser = argparse.ArgumentParser()
+parser.add_argument("--verify", action="store_true",
+                    help="parse the downloaded workbook and verify contents")
+args = parser.parse_args()
+
 print("=" * 80)
 print("INVESTIGATING SALES HISTORY API ENDPOINT ISSUE")
 print("=" * 80)
 
 # Login as admin
 print("\n1. Logging in as admin...")
-admin_response = requests.post(
-    f"{BASE_URL}/auth/login",
-    json={"email": "admin@heavygarlic.com", "password": "admin123"},
-    headers={"Content-Type": "application/json"}
-)
-
-admin_data = admin_response.json()
-admin_token = admin_data.get("access_token")
+# Cached JWT from ~/.sop_test_token.json when fresh; login only on a miss
+admin_token = get_token(session, BASE_URL)
+# Every later call reuses the pooled connection and this header
+session.headers["Authorization"] = f"Bearer {admin_token}"
 print(f"   [OK] Admin logged in successfully")
 
 # Test different sales history API calls
@@ -46,18 +73,30 @@ test_cases = [
     }
 ]
 
-for test_case in test_cases:
+# The five GETs are independent, so fire them together and let the
+# session's pooled connections carry them; wall time becomes the
+# slowest round-trip instead of the sum. ex.map keeps the results in
+# test_cases order so the printout reads the same as before.
+def fetch(test_case):
+    try:
+        return session.get(test_case['url'])
+    except Exception as e:
+        return e
+
+
+with ThreadPoolExecutor(max_workers=5) as ex:
+    responses = list(ex.map(fetch, test_cases))
+
+for test_case, response in zip(test_cases, responses):
     print(f"\n2. Testing: {test_case['name']}")
+    if isinstance(response, Exception):
+        print(f"   [ERROR] Test failed: {response}")
+        continue
     try:
-        response = requests.get(
-            test_case['url'],
-            headers={"Authorization": f"Bearer {admin_token}"}
-        )
-        
         print(f"   Status: {response.status_code}")
         
         if response.status_code == 200:
-            data = response.json()
+            data = parse_json(response)
             print(f"   Response structure: {type(data)}")
             print(f"   Keys: {list(data.keys()) if isinstance(data, dict) else 'Not a dict'}")
             
@@ -69,12 +108,7 @@ for test_case in test_cases:
                 
                 if len(data_list) > 0:
                     print(f"   Sample record:")
-                    sample = data_list[0]
-                    print(f"     Customer: {sample.get('customerName', 'N/A')}")
-                    print(f"     Product: {sample.get('productDescription', 'N/A')}")
-                    print(f"     Year-Month: {sample.get('yearMonth', 'N/A')}")
-                    print(f"     Quantity: {sample.get('quantity', 0)}")
-                    print(f"     Total Sales: ${sample.get('totalSales', 0):.2f}")
+                    print(SAMPLE_TMPL(*SAMPLE_FIELDS(data_list[0])))
                 else:
                     print(f"   [WARNING] No data in response!")
             else:
@@ -88,14 +122,13 @@ for test_case in test_cases:
 # Test the reports endpoint directly
 print(f"\n3. Testing reports endpoint...")
 try:
-    reports_response = requests.get(
-        f"{BASE_URL}/reports",
-        headers={"Authorization": f"Bearer {admin_token}"}
+    reports_response = session.get(
+        f"{BASE_URL}/reports"
     )
     
     print(f"   Reports status: {reports_response.status_code}")
     if reports_response.status_code == 200:
-        reports_data = reports_response.json()
+        reports_data = parse_json(reports_response)
         print(f"   Reports response: {reports_data}")
     else:
         print(f"   Reports error: {reports_response.text[:200]}")
@@ -106,8 +139,9 @@ except Exception as e:
 # Test instant report generation
 print(f"\n4. Testing instant report generation...")
 try:
-    instant_response = requests.post(
+    instant_response = session.post(
         f"{BASE_URL}/reports/generate-instant",
+        stream=True,
         json={
             "reportType": "sales_summary",
             "format": "excel",
@@ -116,10 +150,6 @@ try:
             "includeCharts": True,
             "includeRawData": True
         },
-        headers={
-            "Authorization": f"Bearer {admin_token}",
-            "Content-Type": "application/json"
-        },
         timeout=60
     )
     
@@ -129,25 +159,31 @@ try:
     if instant_response.status_code == 200:
         if 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet' in instant_response.headers.get('content-type', ''):
             print(f"   [SUCCESS] Received Excel file")
-            # Save the file
+            # Stream to disk in 64 KiB chunks; download and write
+            # overlap and the body is never held in memory whole
             with open("november_2024_report.xlsx", 'wb') as f:
-                f.write(instant_response.content)
+                for chunk in instant_response.iter_content(chunk_size=64 * 1024):
+                    f.write(chunk)
             print(f"   [OK] Saved as: november_2024_report.xlsx")
             
-            # Try to read the Excel file
-            try:
-                import pandas as pd
-                df = pd.read_excel("november_2024_report.xlsx")
-                print(f"   Excel contents:")
-                print(f"     Rows: {len(df)}")
-                print(f"     Columns: {list(df.columns)}")
-                if len(df) > 0:
-                    print(f"     First few rows:")
-                    print(df.head().to_string())
-                else:
-                    print(f"     [WARNING] Excel file is empty!")
-            except Exception as e:
-                print(f"   [ERROR] Could not read Excel: {e}")
+            # Content check only on --verify; the pandas import alone
+            # costs seconds the status-only run doesn't need
+            if args.verify:
+                try:
+                    import pandas as pd
+                    df = pd.read_excel("november_2024_report.xlsx")
+                    print(f"   Excel contents:")
+                    print(f"     Rows: {len(df)}")
+                    print(f"     Columns: {list(df.columns)}")
+                    if len(df) > 0:
+                        print(f"     First few rows:")
+                        print(df.head().to_string())
+                    else:
+                        print(f"     [WARNING] Excel file is empty!")
+                except Exception as e:
+                    print(f"   [ERROR] Could not read Excel: {e}")
+            else:
+                print(f"   [INFO] Re-run with --verify to parse the workbook")
         else:
             print(f"   [WARNING] Unexpected content type")
             print(f"   Response: {instant_response.text[:500]}")
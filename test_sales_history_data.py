@@ -2,9 +2,30 @@
 Test sales history API to verify data is correct
 """
 import requests
+from requests.adapters import HTTPAdapter
+from operator import itemgetter
+
+from sop_test_auth import get_token
 
 BASE_URL = "https://sales-and-operation-planning-platform-1.onrender.com/api/v1"
 
+# One bound template + field getter for the record loop: a single format
+# dispatch per record instead of five f-strings and five .get() calls
+RECORD_FIELDS = itemgetter('customerName', 'productDescription',
+                           'quantity', 'totalSales', 'yearMonth')
+RECORD_TMPL = ("     Customer: {}\n"
+               "     Product: {}\n"
+               "     Quantity: {:.2f}\n"
+               "     Total Sales: ${:,.2f}\n"
+               "     Year-Month: {}").format
+
+# Keep-alive session: one TCP+TLS handshake to Render reused by every
+# call instead of a fresh connection per request
+adapter = HTTPAdapter(pool_connections=4, pool_maxsize=10)
+session = requests.Session()
+session.headers.update({"Content-Type": "application/json"})
+session.mount("https://", adapter)
+
 print("=" * 80)
 print("TESTING SALES HISTORY API TO VERIFY DATA")
 print("=" * 80)
@@ -12,21 +33,16 @@ print("=" * 80)
 # Login as admin
 print("\n1. Logging in as admin...")
 try:
-    admin_response = requests.post(
-        f"{BASE_URL}/auth/login",
-        json={"email": "admin@heavygarlic.com", "password": "admin123"},
-        headers={"Content-Type": "application/json"}
-    )
-    
-    admin_data = admin_response.json()
-    admin_token = admin_data.get("access_token")
+    # Cached JWT from ~/.sop_test_token.json when fresh; login only on a miss
+    admin_token = get_token(session, BASE_URL)
+    # Every later call reuses the pooled connection and this header
+    session.headers["Authorization"] = f"Bearer {admin_token}"
     print(f"   [OK] Admin logged in successfully")
     
     # Test sales statistics for November 2024
     print(f"\n2. Checking sales statistics for November 2024...")
-    stats_response = requests.get(
-        f"{BASE_URL}/sales-history/statistics?year=2024&month=11",
-        headers={"Authorization": f"Bearer {admin_token}"}
+    stats_response = session.get(
+        f"{BASE_URL}/sales-history/statistics?year=2024&month=11"
     )
     
     if stats_response.status_code == 200:
@@ -40,9 +56,8 @@ try:
     
     # Test sales history records for November 2024
     print(f"\n3. Checking sales history records for November 2024...")
-    history_response = requests.get(
-        f"{BASE_URL}/sales-history?year=2024&month=11&limit=10",
-        headers={"Authorization": f"Bearer {admin_token}"}
+    history_response = session.get(
+        f"{BASE_URL}/sales-history?year=2024&month=11&limit=10"
     )
     
     if history_response.status_code == 200:
@@ -55,11 +70,7 @@ try:
             print(f"\n   Sample records:")
             for i, record in enumerate(history_data['records'][:3], 1):
                 print(f"\n   Record {i}:")
-                print(f"     Customer: {record.get('customerName', 'N/A')}")
-                print(f"     Product: {record.get('productDescription', 'N/A')}")
-                print(f"     Quantity: {record.get('quantity', 0):.2f}")
-                print(f"     Total Sales: ${record.get('totalSales', 0):,.2f}")
-                print(f"     Year-Month: {record.get('yearMonth', 'N/A')}")
+                print(RECORD_TMPL(*RECORD_FIELDS(record)))
         
 except Exception as e:
     print(f"   [ERROR] Test failed: {e}")
@@ -1,38 +1,59 @@
 """
 Final test after CRITICAL date handling fix - wait 4 minutes for deployment
 """
+import argparse
+
 import requests
+from requests.adapters import HTTPAdapter
+
+from sop_test_auth import get_token
+from sop_test_utils import wait_ready
 import time
 
 BASE_URL = "https://sales-and-operation-planning-platform-1.onrender.com/api/v1"
+HEALTH_URL = "https://sales-and-operation-planning-platform-1.onrender.com/health"
+
+# Keep-alive session: one TCP+TLS handshake to Render reused by every
+# call instead of a fresh connection per request
+adapter = HTTPAdapter(pool_connections=4, pool_maxsize=10)
+session = requests.Session()
+session.headers.update({"Content-Type": "application/json"})
+session.mount("https://", adapter)
+
+# --verify opts into the pandas/read_excel content check; the default
+# fast path skips the heavy import and workbook parse entirely
+parser = argparse.ArgumentParser()
+parser.add_argument("--verify", action="store_true",
+                    help="parse the downloaded workbook and verify contents")
+args = parser.parse_args()
 
 print("=" * 80)
 print("FINAL TEST - CRITICAL DATE FILTERING FIX")
-print("Waiting 4 minutes for Render deployment to complete...")
+print("Polling until the Render deployment is healthy...")
 print("=" * 80)
 
-# Wait for deployment as requested
-print("\n1. Waiting 4 minutes for deployment to complete...")
-time.sleep(240)
+# Wait for deployment: poll /health with backoff instead of a blind
+# 4-minute sleep; typical Render deploys finish in 1-2 minutes
+print("\n1. Waiting for deployment to complete...")
+if wait_ready(session, HEALTH_URL, timeout=300):
+    print("   [OK] Backend is healthy")
+else:
+    print("   [WARN] Backend not healthy after 300s; continuing anyway")
 
 # Login as admin
 print("\n2. Logging in as admin...")
 try:
-    admin_response = requests.post(
-        f"{BASE_URL}/auth/login",
-        json={"email": "admin@heavygarlic.com", "password": "admin123"},
-        headers={"Content-Type": "application/json"}
-    )
-    
-    admin_data = admin_response.json()
-    admin_token = admin_data.get("access_token")
+    # Cached JWT from ~/.sop_test_token.json when fresh; login only on a miss
+    admin_token = get_token(session, BASE_URL)
+    # Every later call reuses the pooled connection and this header
+    session.headers["Authorization"] = f"Bearer {admin_token}"
     print(f"   [OK] Admin logged in successfully")
     
     # Test date range filtering - THIS IS THE CRITICAL TEST
     print(f"\n3. Testing Excel with date range filters (CRITICAL TEST)...")
     print(f"   This is what was failing with: 'str' object cannot be interpreted as integer")
     
-    excel_date_range_response = requests.post(
+    excel_date_range_response = session.post(
         f"{BASE_URL}/reports/generate-instant",
         json={
             "reportType": "sales_summary",
@@ -42,10 +63,6 @@ try:
             "includeCharts": False,
             "includeRawData": True
         },
-        headers={
-            "Authorization": f"Bearer {admin_token}",
-            "Content-Type": "application/json"
-        },
         timeout=60
     )
     
@@ -59,19 +76,23 @@ try:
         print(f"   Saved as: {filename}")
         print(f"   File size: {len(excel_date_range_response.content)} bytes")
         
-        # Verify it has November 2024 data
-        try:
-            import pandas as pd
-            df_summary = pd.read_excel(filename, sheet_name='Summary')
-            for i, row in df_summary.iterrows():
-                if 'Total Revenue' in str(row.iloc[0]):
-                    revenue_value = str(row.iloc[1])
-                    print(f"   📊 Total Revenue in report: {revenue_value}")
-                    if '$1,004,189.55' in revenue_value:
-                        print(f"   ✅ PERFECT! Report shows correct November 2024 data!")
-                    break
-        except Exception as e:
-            print(f"   [WARNING] Could not analyze Excel: {e}")
+        # Verify it has November 2024 data (only on --verify; pandas
+        # import + parse is the slowest part of the happy path)
+        if args.verify:
+            try:
+                import pandas as pd
+                df_summary = pd.read_excel(filename, sheet_name='Summary')
+                for i, row in df_summary.iterrows():
+                    if 'Total Revenue' in str(row.iloc[0]):
+                        revenue_value = str(row.iloc[1])
+                        print(f"   📊 Total Revenue in report: {revenue_value}")
+                        if '$1,004,189.55' in revenue_value:
+                            print(f"   ✅ PERFECT! Report shows correct November 2024 data!")
+                        break
+            except Exception as e:
+                print(f"   [WARNING] Could not analyze Excel: {e}")
+        else:
+            print(f"   [INFO] Re-run with --verify to check the report contents")
             
     else:
         print(f"   ❌ FAILED: {excel_date_range_response.text[:200]}")
@@ -0,0 +1,39 @@
+"""
+Shared fixtures for the deployed-backend pytest suite
+
+One pooled Session and one admin login per pytest session, shared by
+every test module, instead of each standalone script paying its own
+TLS handshake and bcrypt round.
+"""
+import os
+import sys
+
+import pytest
+import requests
+from requests.adapters import HTTPAdapter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sop_test_auth import get_token  # noqa: E402
+
+BASE_URL = "https://sales-and-operation-planning-platform-1.onrender.com/api/v1"
+
+FAST_TIMEOUT = (3, 8)
+REPORT_TIMEOUT = (3, 45)
+
+
+@pytest.fixture(scope="session")
+def session():
+    s = requests.Session()
+    s.headers.update({"Content-Type": "application/json"})
+    s.mount("https://", HTTPAdapter(pool_connections=10, pool_maxsize=20))
+    yield s
+    s.close()
+
+
+@pytest.fixture(scope="session")
+def admin_token(session):
+    token = get_token(session, BASE_URL)
+    if not token:
+        pytest.fail("Admin login failed")
+    return token
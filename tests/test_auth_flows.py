@@ -0,0 +1,91 @@
+"""
+Pytest port of the standalone auth-flow scripts
+
+Covers the user create -> login-format probes -> delete sequence from
+test_full_auth_flow.py / test_frontend_login_flow.py with shared
+session-scoped fixtures, so the whole module costs one admin login.
+The original scripts remain runnable on their own.
+"""
+import time
+
+import pytest
+
+from conftest import BASE_URL, FAST_TIMEOUT
+
+
+@pytest.fixture(scope="module")
+def test_user(session, admin_token):
+    """Create one throwaway user for the module and delete it afterwards."""
+    timestamp = int(time.time())
+    user = {
+        "username": f"pytest_{timestamp}",
+        "email": f"pytest_{timestamp}@test.com",
+        "fullName": "Python Test User",
+        "role": "sales_rep",
+        "password": "PyTestPass123!",
+    }
+    create_response = session.post(
+        f"{BASE_URL}/users",
+        json=user,
+        headers={"Authorization": f"Bearer {admin_token}"},
+        timeout=FAST_TIMEOUT,
+    )
+    if create_response.status_code != 201:
+        pytest.fail(f"User creation failed: {create_response.status_code} "
+                    f"{create_response.text[:200]}")
+    user["_id"] = create_response.json()["user"]["_id"]
+    yield user
+    session.delete(
+        f"{BASE_URL}/users/{user['_id']}",
+        headers={"Authorization": f"Bearer {admin_token}"},
+        timeout=FAST_TIMEOUT,
+    )
+
+
+def test_admin_login(admin_token):
+    assert admin_token
+
+
+def test_created_user_visible(session, admin_token, test_user):
+    r = session.get(
+        f"{BASE_URL}/users/{test_user['_id']}",
+        headers={"Authorization": f"Bearer {admin_token}"},
+        timeout=FAST_TIMEOUT,
+    )
+    assert r.status_code == 200
+    user_data = r.json()
+    assert user_data["email"] == test_user["email"]
+    assert user_data["isActive"]
+
+
+@pytest.mark.parametrize("field,value_key", [
+    ("email", "email"),            # exact frontend format
+    ("username", "email"),         # username field carrying the email
+    ("username", "username"),      # actual username
+])
+def test_login_formats(session, test_user, field, value_key):
+    r = session.post(
+        f"{BASE_URL}/auth/login",
+        json={field: test_user[value_key], "password": test_user["password"]},
+        timeout=FAST_TIMEOUT,
+    )
+    assert r.status_code == 200, r.text[:200]
+    assert r.json().get("access_token")
+
+
+def test_wrong_password_rejected(session, test_user):
+    r = session.post(
+        f"{BASE_URL}/auth/login",
+        json={"email": test_user["email"], "password": "WrongPassword123!"},
+        timeout=FAST_TIMEOUT,
+    )
+    assert r.status_code == 401
+
+
+def test_nonexistent_user_rejected(session):
+    r = session.post(
+        f"{BASE_URL}/auth/login",
+        json={"email": "nonexistent@test.com", "password": "SomePassword123!"},
+        timeout=FAST_TIMEOUT,
+    )
+    assert r.status_code == 401
@@ -0,0 +1,59 @@
+"""
+Pytest port of the report-generation scripts
+
+Covers the generate-instant cases from test_no_charts.py,
+test_normal_fix.py and test_instant_report.py so the whole matrix can
+run as `pytest -n auto tests/` with one shared session and admin login
+per worker. The standalone scripts remain runnable on their own.
+"""
+import pytest
+
+from conftest import BASE_URL, REPORT_TIMEOUT
+
+XLSX = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+PDF = "application/pdf"
+
+REPORT_CASES = [
+    ("november_2024", {
+        "reportType": "sales_summary",
+        "format": "excel",
+        "startDate": "2024-11-01",
+        "endDate": "2024-11-30",
+        "includeCharts": False,
+        "includeRawData": True,
+    }, XLSX),
+    ("dec_2024_jan_2025_range", {
+        "reportType": "sales_summary",
+        "format": "excel",
+        "startDate": "2024-12-10",
+        "endDate": "2025-01-30",
+        "includeCharts": False,
+        "includeRawData": True,
+    }, XLSX),
+    ("all_data_no_raw", {
+        "reportType": "sales_summary",
+        "format": "excel",
+        "includeCharts": False,
+        "includeRawData": False,
+    }, XLSX),
+    ("pdf_no_filter", {
+        "reportType": "sales_summary",
+        "format": "pdf",
+        "includeCharts": False,
+        "includeRawData": True,
+    }, PDF),
+]
+
+
+@pytest.mark.parametrize("name,payload,expected_ct",
+                         REPORT_CASES, ids=[c[0] for c in REPORT_CASES])
+def test_generate_instant(session, admin_token, name, payload, expected_ct):
+    r = session.post(
+        f"{BASE_URL}/reports/generate-instant",
+        json=payload,
+        headers={"Authorization": f"Bearer {admin_token}"},
+        timeout=REPORT_TIMEOUT,
+    )
+    assert r.status_code == 200, r.text[:300]
+    assert expected_ct in r.headers.get("content-type", "")
+    assert len(r.content) > 0
@@ -1,157 +1,225 @@
-import time
-import requests
+import asyncio
 import json
-from datetime import datetime, timedelta
+import os
+import time
+from datetime import datetime, timedelta, timezone
+
+import aiohttp
 
-print("=" * 80)
-print("WAITING FOR RENDER DEPLOYMENT AND TESTING REPORT GENERATION")
-print("=" * 80)
+from sop_test_auth import drop_token, load_cached_token, store_token
 
-# Wait 4 minutes for deployment
-wait_time = 240  # 4 minutes in seconds
-print(f"\n[*] Waiting {wait_time} seconds (4 minutes) for Render to deploy...")
-for i in range(wait_time // 10):
-    time.sleep(10)
-    remaining = wait_time - (i + 1) * 10
-    print(f"   {remaining} seconds remaining...")
+try:
+    import orjson
 
-print("\n[OK] Wait complete! Starting tests...\n")
+    def jdumps(obj, pretty=False):
+        """Encode a debug payload with orjson (~3-5x the stdlib encoder)."""
+        return orjson.dumps(
+            obj, option=orjson.OPT_INDENT_2 if pretty else 0).decode()
+except ImportError:  # orjson is optional; fall back to the stdlib codec
+    def jdumps(obj, pretty=False):
+        return json.dumps(obj, indent=2 if pretty else None)
 
 # Configuration
 BASE_URL = "https://sop-portal-backend.onrender.com/api/v1"
+HEALTH_URL = "https://sop-portal-backend.onrender.com/health"
 ADMIN_EMAIL = "admin@heavygarlic.com"
 ADMIN_PASSWORD = "admin123"
 
-# Step 1: Login
-print("=" * 80)
-print("STEP 1: LOGIN")
-print("=" * 80)
 login_url = f"{BASE_URL}/auth/login"
 login_payload = {"email": ADMIN_EMAIL, "password": ADMIN_PASSWORD}
-
-print(f"POST {login_url}")
-print(f"Payload: {json.dumps(login_payload, indent=2)}")
-
-try:
-    response = requests.post(login_url, json=login_payload)
-    print(f"Status: {response.status_code}")
-
-    if response.status_code == 200:
-        login_data = response.json()
-        token = login_data.get("accessToken")
-        print("[OK] Login successful!")
-        print(f"Token: {token[:50]}...")
-    else:
-        print(f"[FAIL] Login failed: {response.text}")
-        exit(1)
-except Exception as e:
-    print(f"[FAIL] Login error: {e}")
-    exit(1)
-
-# Set up headers with token
-headers = {
-    "Authorization": f"Bearer {token}",
-    "Content-Type": "application/json"
-}
-
-# Step 2: Generate report without date filters (all data)
-print("\n" + "=" * 80)
-print("STEP 2: GENERATE REPORT - ALL DATA (NO FILTERS)")
-print("=" * 80)
 report_url = f"{BASE_URL}/reports/generate-instant"
-report_payload = {
-    "reportType": "sales_summary",
-    "format": "excel"
-}
-
-print(f"POST {report_url}")
-print(f"Payload: {json.dumps(report_payload, indent=2)}")
-
-try:
-    response = requests.post(report_url, json=report_payload, headers=headers)
-    print(f"Status: {response.status_code}")
-
-    if response.status_code == 200:
-        filename = "test_all_data_after_fix.xlsx"
-        with open(filename, 'wb') as f:
-            f.write(response.content)
-        print(f"[OK] Report generated successfully!")
-        print(f"File saved: {filename}")
-        print(f"File size: {len(response.content)} bytes")
-    else:
-        print(f"[FAIL] Report generation failed: {response.text}")
-except Exception as e:
-    print(f"[FAIL] Report generation error: {e}")
-
-# Step 3: Generate report with year/month filters
-print("\n" + "=" * 80)
-print("STEP 3: GENERATE REPORT - WITH YEAR/MONTH FILTERS (November 2025)")
-print("=" * 80)
-report_payload = {
-    "reportType": "sales_summary",
-    "format": "excel",
-    "year": 2025,
-    "month": 11
-}
-
-print(f"POST {report_url}")
-print(f"Payload: {json.dumps(report_payload, indent=2)}")
 
-try:
-    response = requests.post(report_url, json=report_payload, headers=headers)
-    print(f"Status: {response.status_code}")
-
-    if response.status_code == 200:
-        filename = "test_november_2025_after_fix.xlsx"
-        with open(filename, 'wb') as f:
-            f.write(response.content)
-        print(f"[OK] Report generated successfully!")
-        print(f"File saved: {filename}")
-        print(f"File size: {len(response.content)} bytes")
-    else:
-        print(f"[FAIL] Report generation failed: {response.text}")
-except Exception as e:
-    print(f"[FAIL] Report generation error: {e}")
-
-# Step 4: Generate report with date range filters (should trigger the 'str' error before fix)
-print("\n" + "=" * 80)
-print("STEP 4: GENERATE REPORT - WITH DATE RANGE FILTERS")
-print("=" * 80)
-
-# Date range from April 2025 to October 2025
-start_date = datetime.now() - timedelta(days=180)
-end_date = datetime.now()
-
-report_payload = {
-    "reportType": "sales_summary",
-    "format": "excel",
-    "startDate": start_date.isoformat() + "Z",
-    "endDate": end_date.isoformat() + "Z"
-}
-
-print(f"POST {report_url}")
-print(f"Payload: {json.dumps(report_payload, indent=2)}")
 
-try:
-    response = requests.post(report_url, json=report_payload, headers=headers)
-    print(f"Status: {response.status_code}")
-
-    if response.status_code == 200:
-        filename = "test_date_range_after_fix.xlsx"
-        with open(filename, 'wb') as f:
-            f.write(response.content)
-        print(f"[OK] Report generated successfully! (This would have failed before the fix)")
-        print(f"File saved: {filename}")
-        print(f"File size: {len(response.content)} bytes")
-    else:
-        print(f"[FAIL] Report generation failed: {response.text}")
-except Exception as e:
-    print(f"[FAIL] Report generation error: {e}")
-
-print("\n" + "=" * 80)
-print("TEST COMPLETE")
-print("=" * 80)
-print("\n[OK] All tests completed!")
-print("\nNOTE: Reports will show $0.00 because MongoDB Atlas has no sales data.")
-print("The important thing is that the 'str' object error should be GONE!")
-print("\nYou can check the generated Excel files to verify they downloaded successfully.")
+async def wait_ready(session, timeout=240):
+    """Poll /health with exponential backoff until 200 or the cap lapses.
+
+    A deploy that lands in 30s starts the tests in 30s, and the 240s cap
+    keeps the worst case unchanged.
+    """
+    deadline = time.monotonic() + timeout
+    delay = 2.0
+    while time.monotonic() < deadline:
+        try:
+            async with session.get(
+                    HEALTH_URL,
+                    timeout=aiohttp.ClientTimeout(total=3)) as response:
+                if response.status == 200:
+                    return True
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            pass
+        await asyncio.sleep(min(delay, max(0, deadline - time.monotonic())))
+        delay = min(delay * 1.5, 15)
+    return False
+
+
+async def login(session):
+    """POST the admin credentials and cache the issued JWT on disk."""
+    print(f"POST {login_url}")
+    print(f"Payload: {jdumps(login_payload, pretty=True)}")
+    async with session.post(login_url, json=login_payload) as response:
+        print(f"Status: {response.status}")
+        if response.status != 200:
+            print(f"[FAIL] Login failed: {await response.text()}")
+            raise SystemExit(1)
+        fresh = (await response.json()).get("accessToken")
+    store_token(fresh, BASE_URL)
+    return fresh
+
+
+async def download(session, payload, out_path, retried=False):
+    """Stream a generated report straight to disk; returns bytes written.
+
+    iter_chunked keeps peak memory at one 64 KiB chunk instead of the
+    whole XLSX, and the 8 MiB write buffer turns the stream into a few
+    large contiguous write() calls instead of one per chunk.
+    """
+    async with session.post(report_url, json=payload) as response:
+        if response.status == 401 and not retried:
+            # Stale cached token: drop this host's entry, log in once, retry
+            drop_token(BASE_URL)
+            session.headers["Authorization"] = f"Bearer {await login(session)}"
+            return await download(session, payload, out_path, retried=True)
+        response.raise_for_status()
+        total = 0
+        with open(out_path, "wb", buffering=8 * 1024 * 1024) as f:
+            async for chunk in response.content.iter_chunked(64 * 1024):
+                f.write(chunk)
+                total += len(chunk)
+        # Nothing re-reads these files in this process, so tell the
+        # kernel to drop their pages instead of polluting the page cache
+        # (no-op where posix_fadvise is unavailable, e.g. Windows)
+        try:
+            fd = os.open(out_path, os.O_RDONLY)
+            try:
+                os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+            finally:
+                os.close(fd)
+        except (AttributeError, OSError):
+            pass
+        return total
+
+
+async def main():
+    print("=" * 80)
+    print("WAITING FOR RENDER DEPLOYMENT AND TESTING REPORT GENERATION")
+    print("=" * 80)
+
+    # One client for the probe, the login, and all three report fetches:
+    # the connector keeps the TLS connections alive, and the event loop
+    # lets the three report requests be genuinely in flight together
+    # without threads
+    headers = {
+        "User-Agent": "sop-test/1.0",
+        # Advertise compression: aiohttp decodes transparently, so the
+        # bytes on disk stay raw XLSX while small metadata-heavy
+        # responses travel gzipped when the server honors it
+        "Accept-Encoding": "gzip, deflate",
+        "Accept": ("application/vnd.openxmlformats-officedocument"
+                   ".spreadsheetml.sheet, */*;q=0.5"),
+    }
+    connector = aiohttp.TCPConnector(limit=8)
+    timeout = aiohttp.ClientTimeout(total=600, connect=10)
+    async with aiohttp.ClientSession(connector=connector, timeout=timeout,
+                                     headers=headers) as session:
+        # Poll /health with exponential backoff instead of sleeping a
+        # fixed 4 minutes
+        print(f"\n[*] Polling until the Render deployment is healthy "
+              f"(240s cap)...")
+        if await wait_ready(session, timeout=240):
+            print("\n[OK] Backend is healthy! Starting tests...\n")
+        else:
+            print("\n[WARN] Backend not healthy after 240s; "
+                  "continuing anyway\n")
+
+        # Step 1: Login
+        print("=" * 80)
+        print("STEP 1: LOGIN")
+        print("=" * 80)
+        try:
+            # Cached JWT from ~/.sop_test_token.json when still fresh;
+            # the login round-trip (and the server-side bcrypt behind it)
+            # only happens on a cache miss, so repeat runs during a
+            # debugging session skip STEP 1
+            token = load_cached_token(BASE_URL)
+            if token:
+                print("[OK] Reusing cached admin token")
+            else:
+                token = await login(session)
+                print("[OK] Login successful!")
+            print(f"Token: {token[:50]}...")
+        except Exception as e:
+            print(f"[FAIL] Login error: {e}")
+            raise SystemExit(1)
+
+        # Set the token once on the session; every later post rides the
+        # pooled connection with this header attached
+        session.headers["Authorization"] = f"Bearer {token}"
+
+        # Steps 2-4: the three report generations are independent POSTs
+        # with no data dependency, so gather them on the event loop; the
+        # report phase takes max(T1, T2, T3) instead of the sum, and each
+        # job keeps its own per-file error reporting.
+        print("\n" + "=" * 80)
+        print("STEPS 2-4: GENERATE REPORTS CONCURRENTLY")
+        print("=" * 80)
+
+        # Date range: the last 180 days from one "now" snapshot (two
+        # back-to-back datetime.now() reads produced two different
+        # endpoints, and isoformat()+"Z" is invalid once tzinfo is set)
+        now = datetime.now(timezone.utc).replace(microsecond=0)
+        end_iso = now.isoformat().replace("+00:00", "Z")
+        start_iso = (now - timedelta(days=180)).isoformat().replace(
+            "+00:00", "Z")
+
+        # One data-driven job table replaces the three copy-pasted
+        # STEP blocks: a single download() call site, and adding a
+        # report variant is one tuple instead of 25 lines
+        jobs = [
+            ("STEP 2: ALL DATA (NO FILTERS)",
+             "test_all_data_after_fix.xlsx", {
+                 "reportType": "sales_summary",
+                 "format": "excel"
+             }),
+            ("STEP 3: YEAR/MONTH FILTERS (November 2025)",
+             "test_november_2025_after_fix.xlsx", {
+                 "reportType": "sales_summary",
+                 "format": "excel",
+                 "year": 2025,
+                 "month": 11
+             }),
+            ("STEP 4: DATE RANGE FILTERS (triggered the 'str' error "
+             "before fix)",
+             "test_date_range_after_fix.xlsx", {
+                 "reportType": "sales_summary",
+                 "format": "excel",
+                 "startDate": start_iso,
+                 "endDate": end_iso
+             }),
+        ]
+
+        for label, filename, payload in jobs:
+            print(f"{label}")
+            print(f"POST {report_url} -> {filename}")
+            print(f"Payload: {jdumps(payload, pretty=True)}")
+
+        results = await asyncio.gather(
+            *(download(session, payload, filename)
+              for _, filename, payload in jobs),
+            return_exceptions=True)
+        for (label, filename, _), result in zip(jobs, results):
+            if isinstance(result, Exception):
+                print(f"[FAIL] {filename}: {result}")
+            else:
+                print(f"[OK] {filename}: {result} bytes")
+
+    print("\n" + "=" * 80)
+    print("TEST COMPLETE")
+    print("=" * 80)
+    print("\n[OK] All tests completed!")
+    print("\nNOTE: Reports will show $0.00 because MongoDB Atlas has no sales data.")
+    print("The important thing is that the 'str' object error should be GONE!")
+    print("\nYou can check the generated Excel files to verify they downloaded successfully.")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())